@@ -2,12 +2,16 @@
 
 import asyncio
 import os
-import pickle
 
 import wandb
 from gosybench import TreeMetrics
+from gosybench.serialize import save_graph
 from jasyntho import SynthTree
 from jasyntho.extract import ExtractReaction
+from jasyntho.utils import SMILES_MEMO, SmilesResolver
+
+# Name -> SMILES memo shared by all papers and configurations, across runs
+smiles_resolver = SmilesResolver(memo_path=SMILES_MEMO)
 
 # For an input paper, run extraction using various methods, log each
 
@@ -29,8 +33,9 @@ async def extractg(
     metrics = TreeMetrics()
 
     try:
-        tree = SynthTree.from_dir(path)
+        tree = SynthTree.from_dir(path, parse_cache=True)
         tree.rxn_extract = ExtractReaction(llm=model)
+        tree.smiles_resolver = smiles_resolver
 
         tree.raw_prods = await tree.async_extract_rss(
             mode=method, si_select=si_select
@@ -53,11 +58,10 @@ async def extractg(
         else:
             si = ""
 
-        with open(
-            os.path.join(path, f"extracted_graph_{k}_{method}_{si}.pickle"),
-            "wb",
-        ) as f:
-            pickle.dump(tree.full_g, f)
+        save_graph(
+            tree.full_g,
+            os.path.join(path, f"extracted_graph_{k}_{method}_{si}.gosyg"),
+        )
 
         # Calc descriptors for extracted graph
         m = metrics(tree)
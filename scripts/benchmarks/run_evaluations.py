@@ -14,31 +14,35 @@ from gosybench.metrics import GraphEval, TreeMetrics
 logger = setup_logger(__package__)
 
 
+def le_base_method(path, name):
+    """Simply load a precomputed graph (.gosyg, or legacy .pickle)."""
+    logger.debug(f"Loading graph {path}")
+    pfile = os.path.join(path, f"{name}")
+    try:
+        if os.path.exists(f"{pfile}.gosyg"):
+            return STree.load(f"{pfile}.gosyg")
+        tree = STree.from_pickle(f"{pfile}.pickle")
+        return tree
+    except Exception as e:
+        logger.error(f"Error loading {pfile}: {e}")
+        return STree(tree=[], graph=nx.DiGraph())
+
+
 def main():
     gosybench = GOSyBench(
         project="GOSyBench-eval",
         describe=TreeMetrics(),
         metrics=GraphEval(),
+        workers=os.cpu_count() or 1,
     )
 
-    def le_base_method(path, name):
-        """Simply load a precomputed graph."""
-        logger.debug(f"Loading graph {path}")
-        pfile = os.path.join(path, f"{name}")
-        try:
-            tree = STree.from_pickle(pfile)
-            return tree
-        except Exception as e:
-            logger.error(f"Error loading {pfile}: {e}")
-            return STree(tree=[], graph=nx.DiGraph())
-
     llms = ["gpt35", "gpt4t"]
     vis = ["vision", "text"]
     si_selects = ["", "select"]
 
     for l, v, s in product(llms, vis, si_selects):
         le_method = partial(
-            le_base_method, name=f"extracted_graph_{l}_{v}_{s}.pickle"
+            le_base_method, name=f"extracted_graph_{l}_{v}_{s}"
         )
         le_method.__name__ = f"le_{l}_{v}_{s}"
         gosybench.evaluate(le_method)
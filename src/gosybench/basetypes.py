@@ -7,6 +7,9 @@ from typing import List, Optional
 import networkx as nx
 from pydantic import BaseModel, Field
 
+from gosybench.graph_index import ComponentIndex, DescendantIndex
+from gosybench.serialize import load_graph, save_graph
+
 
 class Substance(BaseModel):
     """Substance base class."""
@@ -50,25 +53,47 @@ class STree(BaseModel):
 
         with open(path, "rb") as f:
             graph = pickle.load(f)
+            return cls.from_graph(graph)
 
-            products = []
-            for node in graph.nodes:
-                children = []
-                for child in graph.successors(node):
-                    children.append(
-                        Product(
-                            reference_key=child,
-                            substance_name=graph.nodes[child].get("name"),
-                        )
-                    )
-                products.append(
+    @classmethod
+    def from_graph(cls, graph: nx.DiGraph):
+        """Build an STree from a graph, with one product per node."""
+        products = []
+        for node in graph.nodes:
+            children = []
+            for child in graph.successors(node):
+                children.append(
                     Product(
-                        reference_key=node,
-                        substance_name=graph.nodes[node].get("name"),
-                        children=children,
+                        reference_key=child,
+                        substance_name=graph.nodes[child].get("name"),
                     )
                 )
-            return cls(products=products, graph=graph)
+            products.append(
+                Product(
+                    reference_key=node,
+                    substance_name=graph.nodes[node].get("name"),
+                    children=children,
+                )
+            )
+        return cls(products=products, graph=graph)
+
+    def save(self, path: str):
+        """Save the STree in the compact graph format (see serialize)."""
+        save_graph(
+            self.graph, path, products=[p.model_dump() for p in self.products]
+        )
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True, attrs: bool = True):
+        """Load an STree from a compact graph file.
+
+        If the file holds no products (e.g. converted from a pickled graph),
+        they are derived from the graph as in from_pickle.
+        """
+        graph, products = load_graph(path, mmap=mmap, attrs=attrs)
+        if products is None:
+            return cls.from_graph(graph)
+        return cls(products=[Product(**p) for p in products], graph=graph)
 
     def export(self):
         """Export the STree's reachable subgraph from source nodes into JSON."""
@@ -129,12 +154,10 @@ class STree(BaseModel):
         final_json = [{"smiles": "", "type": "reaction", "children": slist}]
         return final_json
 
-    def get_components(self):
-        G = self.graph
-        indegs = G.in_degree()
-        components = {}
-        for n in G.nodes:
-            if indegs[n] == 0:
-                desc = nx.descendants(G, n)
-                components[n] = G.subgraph(desc | {n})
-        return components
+    def descendant_index(self) -> DescendantIndex:
+        """Descendants of every node of the graph (see DescendantIndex)."""
+        return DescendantIndex(self.graph)
+
+    def get_components(self) -> ComponentIndex:
+        """Subgraph reachable from each head, as views of the graph."""
+        return ComponentIndex.from_graph(self.graph)
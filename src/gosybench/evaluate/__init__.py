@@ -1 +1,3 @@
+from .cache import StatsCache
 from .evaluate import GOSyBench
+from .task import Task, load_tasks
@@ -0,0 +1,78 @@
+"""Content-addressed cache for tree descriptors."""
+
+import hashlib
+import json
+import os
+from typing import Dict, Optional
+
+from gosybench.basetypes import STree
+from gosybench.logger import setup_logger
+
+logger = setup_logger(__package__)
+
+
+class StatsCache:
+    """Cache descriptor results (e.g. TreeMetrics) by tree content.
+
+    Entries are keyed by a hash of the tree plus the descriptor version, so
+    a changed graph or a new metric definition never hits a stale entry.
+    Hash trees with digest() before anything (e.g. GraphEval) annotates
+    them in place.
+    Results are kept in memory and, if directory is given, as JSON files.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        self._mem: Dict[str, dict] = {}
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the cached result for key, if any."""
+        if key in self._mem:
+            return self._mem[key]
+
+        if self.directory is not None:
+            path = self._path(key)
+            if os.path.exists(path):
+                with open(path) as f:
+                    self._mem[key] = json.load(f)
+                logger.debug(f"Loaded cached stats from {path}")
+                return self._mem[key]
+        return None
+
+    def set(self, key: str, value: dict):
+        """Store a result in memory and on disk."""
+        self._mem[key] = value
+        if self.directory is not None:
+            with open(self._path(key), "w") as f:
+                json.dump(value, f)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory or ".", f"{key}.json")
+
+    @staticmethod
+    def key(digest: str, version: str) -> str:
+        """Cache key of a tree digest for a given descriptor version."""
+        return hashlib.sha256(f"{version}:{digest}".encode()).hexdigest()
+
+    @staticmethod
+    def digest(tree: STree) -> str:
+        """Content hash of a tree (nodes, edges and products)."""
+        G = tree.graph
+        nodes = sorted(
+            json.dumps([str(n), G.nodes[n]], sort_keys=True, default=str)
+            for n in G.nodes
+        )
+        edges = sorted(
+            json.dumps(
+                [str(u), str(v), G.edges[u, v]], sort_keys=True, default=str
+            )
+            for u, v in G.edges
+        )
+        products = [p.model_dump_json() for p in tree.products]
+
+        h = hashlib.sha256()
+        for chunk in (nodes, edges, products):
+            h.update(json.dumps(chunk).encode())
+        return h.hexdigest()
@@ -1,69 +1,111 @@
 """Class for evaluating the performance of a model."""
 
-from typing import Callable, List
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Callable, Dict, List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 import wandb
 from gosybench.logger import setup_logger
 from gosybench.metrics import GraphEval, TreeMetrics
 
-from .task import Task, _load_default_tasks
+from .cache import StatsCache
+from .task import Task, load_tasks
 
 logger = setup_logger(__package__)
 
 
 class GOSyBench(BaseModel):
-    """Evaluating the performance of a model for KG extraction."""
-
-    tasks: List[Task] = _load_default_tasks()
+    """Evaluating the performance of a model for KG extraction.
+
+    workers: number of processes to run tasks in. With workers > 1, tasks
+        are fanned out to a process pool, so f, describe and metrics must be
+        picklable (e.g. module-level functions or functools.partial).
+    gt_cache: cache of ground-truth descriptors, reused across evaluate()
+        calls. Only used if describe has a version attribute. Pass
+        StatsCache(directory) to also persist results on disk.
+    out_dir: if given, describe is called with directory=out_dir/<task>/gt
+        for the ground truth and out_dir/<task>/<method> for the method's
+        tree, so that its outputs (e.g. tree.json) are kept per task. With
+        workers > 1 and no out_dir, a temporary directory is used, so that
+        workers never write the same file.
+    """
+
+    tasks: List[Task] = Field(default_factory=load_tasks)
     project: str = "GOSyBench"
     describe: Callable | None = TreeMetrics()
     metrics: Callable | None = GraphEval()
+    workers: int = 1
+    gt_cache: StatsCache = Field(default_factory=StatsCache)
+    out_dir: str | None = None
+
+    class Config:
+        """Model configuration."""
+
+        arbitrary_types_allowed = True
 
     def evaluate(self, f: Callable | None = None):
         """Run the evaluation."""
         logger.info("Running evaluation")
-        results = {}
-        gt_stats = {}
+        runs = self.run_tasks(f)
+        gt_stats = {
+            r["name"]: r["stats"] for r in runs if r["stats"] is not None
+        }
+        results = {
+            r["name"]: r["metrics"] for r in runs if r["metrics"] is not None
+        }
+
         with wandb.init(  # type: ignore
             project=self.project, config={"method": f.__name__ if f else None}
         ):
-
-            for task in self.tasks:
-                logger.info(f"Running task {task}")
-                if self.describe:
-                    logger.debug(f"Describing task {task}")
-                    s = self.describe(task.tree)
-                    logger.debug(f"Done describing task {task}")
-                    gt_stats[task.name] = s
-
-                if f:
-                    logger.info(
-                        f"Running task {task} with method {f.__name__}"
-                    )
-                    result = task.run(f)
-                    logger.info(
-                        f"Finished task {task}. Time: {result['time']:0.5f}s"
-                    )
-                    if self.describe:
-                        logger.debug(f"Describing task {task}")
-                        self.describe(result["tree"])
-                        logger.debug(f"Done describing task {task}")
-                    if self.metrics:
-                        logger.debug(f"Calculating metrics for task {task}")
-                        metrics = self.metrics(
-                            task.tree.graph, result["tree"].graph
-                        )
-                        results[task.name] = metrics
-                        logger.debug(
-                            f"Done calculating metrics for task {task}"
-                        )
             logger.info("Done evaluating")
             self.report_stats(gt_stats)
             if f:
                 self.report(results)
 
+    def run_tasks(self, f: Callable | None = None) -> List[Dict]:
+        """Run all tasks, in order, possibly in parallel."""
+        keys = self._gt_cache_keys()
+        gt_stats = [self.gt_cache.get(k) if k else None for k in keys]
+        out_dir = self.out_dir
+        if out_dir is None and self.workers > 1:
+            out_dir = tempfile.mkdtemp(prefix="gosybench-")
+            logger.info(f"Writing task outputs to {out_dir}")
+        args = (
+            self.tasks,
+            repeat(f),
+            repeat(self.describe),
+            repeat(self.metrics),
+            gt_stats,
+            [
+                None if out_dir is None else os.path.join(out_dir, t.name)
+                for t in self.tasks
+            ],
+        )
+        if self.workers > 1:
+            logger.info(
+                f"Running {len(self.tasks)} tasks on {self.workers} workers"
+            )
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                runs = list(pool.map(_run_task, *args))
+        else:
+            runs = list(map(_run_task, *args))
+
+        for key, stats, run in zip(keys, gt_stats, runs):
+            if key and stats is None and run["stats"] is not None:
+                self.gt_cache.set(key, run["stats"])
+        return runs
+
+    def _gt_cache_keys(self) -> List[str | None]:
+        """Cache key of each task's ground truth (None if not cacheable)."""
+        version = getattr(self.describe, "version", None)
+        if version is None:
+            return [None] * len(self.tasks)
+        return [StatsCache.key(task.digest, version) for task in self.tasks]
+
     def report(self, results: dict):
         """Make a table and report to wandb."""
         table = wandb.Table(columns=["Task", "Metrics"])  # type: ignore
@@ -97,6 +139,54 @@ class GOSyBench(BaseModel):
         wandb.summary.update(summ)  # type: ignore
 
 
+def _run_task(
+    task: Task,
+    f: Callable | None,
+    describe: Callable | None,
+    metrics: Callable | None,
+    gt_stats: Dict | None = None,
+    directory: str | None = None,
+) -> Dict:
+    """Describe the ground truth of a task, run f on it and evaluate.
+
+    Runs in worker processes when GOSyBench.workers > 1, so it only returns
+    results and never reports to wandb. If gt_stats is given (cached), the
+    ground truth is not described again. With directory, describe writes
+    its outputs in subdirectories of it (see GOSyBench.out_dir).
+    """
+    logger.info(f"Running task {task}")
+    out: Dict = {"name": task.name, "stats": gt_stats, "metrics": None}
+    if describe and gt_stats is None:
+        logger.debug(f"Describing task {task}")
+        out["stats"] = _describe(describe, task.tree, directory, "gt")
+        logger.debug(f"Done describing task {task}")
+
+    if f:
+        logger.info(f"Running task {task} with method {f.__name__}")
+        result = task.run(f)
+        logger.info(f"Finished task {task}. Time: {result['time']:0.5f}s")
+        if describe:
+            logger.debug(f"Describing task {task}")
+            _describe(describe, result["tree"], directory, f.__name__)
+            logger.debug(f"Done describing task {task}")
+        if metrics:
+            logger.debug(f"Calculating metrics for task {task}")
+            out["metrics"] = metrics(task.tree.graph, result["tree"].graph)
+            logger.debug(f"Done calculating metrics for task {task}")
+    return out
+
+
+def _describe(
+    describe: Callable, tree, directory: str | None, name: str
+) -> Dict:
+    """Describe a tree, with its outputs in directory/name if given."""
+    if directory is None:
+        return describe(tree)
+    path = os.path.join(directory, name)
+    os.makedirs(path, exist_ok=True)
+    return describe(tree, directory=path)
+
+
 if __name__ == "__main__":
     gosybench = GOSyBench(
         project="test",
@@ -1,26 +1,41 @@
 """Definition of a GosyBench Task."""
 
+import json
 import os
 import time
-from typing import Callable, Dict, List, Optional
+from fnmatch import fnmatch
+from typing import Callable, Dict, List, Optional, Sequence
 
 import networkx as nx
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
 from gosybench.basetypes import STree
 from gosybench.logger import setup_logger
 
+from .cache import StatsCache
+
 logger = setup_logger(__package__)
 
+TASKS_DIR = os.path.join(os.path.dirname(__file__), "../data/papers/")
+MANIFEST = os.path.join(TASKS_DIR, "manifest.json")
+
 
 class Task(BaseModel):
-    """Definition of a GosyBench Task."""
+    """Definition of a GosyBench Task.
+
+    The ground-truth tree is loaded from path on first access, unless given
+    at construction. Its digest is taken then, before any metric annotates
+    the tree in place, so the ground-truth cache key stays stable.
+    """
 
     name: str = "Default Task"
     description: str = "Default Description"
     dataset: str = "GOSyBench"
     path: str
-    tree: STree
+    nnodes: Optional[int] = None
+    nedges: Optional[int] = None
+    _tree: Optional[STree] = PrivateAttr(default=None)
+    _digest: Optional[str] = PrivateAttr(default=None)
 
     class Config:
         """Model configuration."""
@@ -28,6 +43,34 @@ class Task(BaseModel):
         arbitrary_types_allowed = True
         json_encoders = {"Task": lambda v: v.dict()}
 
+    def __init__(self, tree: Optional[STree] = None, **data):
+        super().__init__(**data)
+        self._tree = tree
+        if tree is not None:
+            self._digest = StatsCache.digest(tree)
+
+    @property
+    def tree(self) -> STree:
+        """Ground-truth tree of the task."""
+        if self._tree is None:
+            gosyg = os.path.join(self.path, "gt_graph.gosyg")
+            if os.path.exists(gosyg):
+                self._tree = STree.load(gosyg)
+            else:
+                self._tree = STree.from_pickle(
+                    os.path.join(self.path, "gt_graph.pickle")
+                )
+            self._digest = StatsCache.digest(self._tree)
+            logger.debug(f"Loaded task from {self.path}")
+        return self._tree
+
+    @property
+    def digest(self) -> str:
+        """Content hash of the ground-truth tree, as loaded."""
+        if self._digest is None:
+            self.tree
+        return self._digest  # type: ignore
+
     def __str__(self):
         return f"{self.name} ({self.dataset})"
 
@@ -58,20 +101,64 @@ class Task(BaseModel):
         }
 
 
-def _load_default_tasks() -> List[Task]:
-    """Load the default tasks for GOSyBench."""
-    tpath = os.path.join(os.path.dirname(__file__), "../data/papers/")
-
-    tasks = []
-    for f in os.listdir(tpath):
-        try:
-            path = os.path.join(tpath, f)
-            tasks.append(Task.from_pickle(path))
-        except FileNotFoundError:
-            continue
+def load_tasks(
+    select: str | Sequence[str] | None = None, manifest: str = MANIFEST
+) -> List[Task]:
+    """Load the GOSyBench tasks, without loading their graphs.
+
+    select: task name or glob pattern (or a list of them) to keep.
+    manifest: JSON index of tasks. If missing, the data directory is listed.
+    """
+    if os.path.exists(manifest):
+        root = os.path.dirname(manifest)
+        with open(manifest) as f:
+            entries = json.load(f)
+    else:
+        root = TASKS_DIR
+        entries = _scan_tasks(root)
+
+    if select is not None:
+        patterns = [select] if isinstance(select, str) else select
+        entries = [
+            e for e in entries if any(fnmatch(e["name"], p) for p in patterns)
+        ]
+
+    return [
+        Task(**dict(e, path=os.path.join(root, e["path"]))) for e in entries
+    ]
+
+
+def _scan_tasks(root: str) -> List[Dict]:
+    """List task directories (those containing a ground-truth graph)."""
+    return [
+        {"name": f, "path": f}
+        for f in sorted(os.listdir(root))
+        if any(
+            os.path.exists(os.path.join(root, f, g))
+            for g in ("gt_graph.gosyg", "gt_graph.pickle")
+        )
+    ]
+
+
+def build_manifest(manifest: str = MANIFEST) -> List[Dict]:
+    """Index all tasks in the data directory, with their graph sizes."""
+    entries = []
+    for e in _scan_tasks(TASKS_DIR):
+        path = os.path.join(TASKS_DIR, e["path"])
+        G = Task(name=e["name"], path=path).tree.graph
+        entries.append(
+            {
+                "name": e["name"],
+                "path": os.path.relpath(path, os.path.dirname(manifest)),
+                "nnodes": len(G.nodes),
+                "nedges": len(G.edges),
+            }
+        )
 
-    return tasks
+    with open(manifest, "w") as f:
+        json.dump(entries, f, indent=2)
+    return entries
 
 
 if __name__ == "__main__":
-    _load_default_tasks()
+    build_manifest()
@@ -0,0 +1,172 @@
+"""Reachability index of synthesis graphs."""
+
+from typing import Dict, Hashable, Iterable, Iterator, List, Mapping, Set
+
+import networkx as nx
+
+
+class DescendantIndex:
+    """Descendants of every node of a directed graph, computed at once.
+
+    The graph is condensed into its strongly connected components (so
+    cycles are handled), and the descendants of each component are
+    accumulated as a bitset over the nodes in one pass in reverse
+    topological order. Queries then cost no graph traversal: count(n) is
+    len(nx.descendants(G, n)) and descendants(n) is nx.descendants(G, n).
+
+    The index is a snapshot: build a new one after the graph changes.
+    """
+
+    def __init__(self, G: nx.DiGraph):
+        self.nodes: List[Hashable] = list(G.nodes)
+        bit = {n: 1 << i for i, n in enumerate(self.nodes)}
+
+        C = nx.condensation(G)
+        self._comp: Dict[Hashable, int] = C.graph["mapping"]
+        self._reach: Dict[int, int] = {}
+        for c in reversed(list(nx.topological_sort(C))):
+            reach = 0
+            for n in C.nodes[c]["members"]:
+                reach |= bit[n]
+            for s in C.successors(c):
+                reach |= self._reach[s]
+            self._reach[c] = reach
+
+    def count(self, n: Hashable) -> int:
+        """Number of descendants of n."""
+        return self._reach[self._comp[n]].bit_count() - 1
+
+    def has_descendants(self, n: Hashable) -> bool:
+        """Tell if any node other than n is reachable from n."""
+        return self.count(n) > 0
+
+    def descendants(self, n: Hashable) -> Set[Hashable]:
+        """Nodes reachable from n, other than n."""
+        reach = self._reach[self._comp[n]]
+        nodes = set()
+        while reach:
+            low = reach & -reach
+            nodes.add(self.nodes[low.bit_length() - 1])
+            reach ^= low
+        nodes.discard(n)
+        return nodes
+
+
+class ComponentIndex(Mapping):
+    """Reachable subgraph of each head, as views of the graph.
+
+    Maps each head to a read-only subgraph view of the head and its
+    descendants. Only a frozen node set is stored per head; views are made
+    on access and share the nodes, edges and attributes of the graph, so
+    heads with common descendants do not duplicate them. Use .copy() on a
+    view for a mutable, independent graph.
+    """
+
+    def __init__(self, G: nx.DiGraph, members: Mapping[Hashable, frozenset]):
+        self.G = G
+        self.members = members
+        self._views: Dict[Hashable, nx.DiGraph] = {}
+
+    @classmethod
+    def from_graph(cls, G: nx.DiGraph) -> "ComponentIndex":
+        """Components of the heads (nodes without predecessors) of G."""
+        index = DescendantIndex(G)
+        return cls(
+            G,
+            {
+                n: frozenset(index.descendants(n) | {n})
+                for n, indeg in G.in_degree()
+                if indeg == 0
+            },
+        )
+
+    def nodes(self, head: Hashable) -> frozenset:
+        """Nodes of the component of head."""
+        return self.members[head]
+
+    def __getitem__(self, head: Hashable) -> nx.DiGraph:
+        if head not in self._views:
+            self._views[head] = nx.subgraph_view(
+                self.G, filter_node=_ShowFrozen(self.members[head])
+            )
+        return self._views[head]
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self.members)
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+
+class _ShowFrozen(nx.filters.show_nodes):
+    """Node filter on a frozen set, used without a copy."""
+
+    def __init__(self, nodes: frozenset):
+        self.nodes = nodes
+
+
+class ReachIndex:
+    """Heads of a graph and the nodes reachable from each, kept current.
+
+    Heads are the nodes without predecessors. members[h] holds h and its
+    descendants. After nodes and edges are added to the graph, update()
+    adjusts heads and members from the new edges only: a search runs from
+    the target of each new edge, not from every head.
+
+    changed holds the heads whose members or edges changed since it was
+    last cleared, in the order they changed (as dict keys).
+    """
+
+    def __init__(self, G: nx.DiGraph):
+        self.G = G
+        self.members: Dict[Hashable, Set[Hashable]] = {}
+        self.heads_of: Dict[Hashable, Set[Hashable]] = {}
+        self.changed: Dict[Hashable, None] = {}
+
+        heads = [n for n, indeg in G.in_degree() if indeg == 0]
+        index = DescendantIndex(G)
+        for h in heads:
+            self._set_members(h, index.descendants(h) | {h})
+
+    def update(self, nodes: Iterable[Hashable], edges: Iterable[tuple]):
+        """Account for nodes and edges just added to the graph."""
+        G = self.G
+        edges = list(edges)
+        touched = dict.fromkeys(nodes)
+        for u, v in edges:
+            touched.update(dict.fromkeys((u, v)))
+
+        # Nodes that got a predecessor are no longer heads
+        for n in touched:
+            if n in self.members and G.in_degree(n) > 0:
+                for m in self.members.pop(n):
+                    self.heads_of[m].discard(n)
+                self.changed.pop(n, None)
+
+        new = set()
+        for n in touched:
+            if n not in self.members and G.in_degree(n) == 0:
+                self._set_members(n, nx.descendants(G, n) | {n})
+                new.add(n)
+
+        # Heads reaching the source of an edge reach all of its target
+        reach: Dict[Hashable, Set[Hashable]] = {}
+        for u, v in edges:
+            heads = self.heads_of.get(u, set()) - new
+            if not heads:
+                continue
+            if v not in reach:
+                reach[v] = nx.descendants(G, v) | {v}
+            for h in list(heads):
+                self._set_members(h, reach[v])
+
+    def is_head(self, n: Hashable) -> bool:
+        """Tell if n is a head."""
+        return n in self.members
+
+    def _set_members(self, h: Hashable, nodes: Set[Hashable]):
+        """Add nodes to the members of head h."""
+        self.members.setdefault(h, set()).update(nodes)
+        for n in nodes:
+            self.heads_of.setdefault(n, set()).add(h)
+        self.changed[h] = None
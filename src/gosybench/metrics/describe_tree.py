@@ -2,7 +2,7 @@
 
 import json
 import os
-from typing import Any
+from typing import Any, ClassVar
 
 import networkx as nx
 from pydantic import BaseModel
@@ -18,6 +18,9 @@ logger = setup_logger(__package__)
 class TreeMetrics(BaseModel):
     """Calculate descriptive metrics for an extracted tree."""
 
+    # Bump when the output of __call__ changes, to invalidate cached results
+    version: ClassVar[str] = "1"
+
     smiles_path_solver: Any = SmilesPathFinder()
 
     def __call__(self, tree, directory="."):
@@ -1,16 +1,24 @@
 """Metrics for quality of extraction."""
 
 import networkx as nx
-from pydantic import BaseModel
+import numpy as np
+from pydantic import BaseModel, Field, PrivateAttr
 
 from gosybench.logger import setup_logger
 
+from .paths import PathIndexCache, reach_matrix
+
 logger = setup_logger(__package__)
 
 
 class GraphEval(BaseModel):
     """Evaluate the quality of a graph extraction."""
 
+    path_index: PathIndexCache = Field(default_factory=PathIndexCache)
+
+    class Config:
+        arbitrary_types_allowed = True
+
     def __call__(self, gt, og):
         """Evaluate the extraction."""
         logger.debug(f"Comparing graphs {gt} and {og}")
@@ -66,33 +74,17 @@ class GraphEval(BaseModel):
         if len(G) == 0 or len(gt_G) == 0:
             return 0
 
-        quant = []
-        subgraphs = self._get_paths(G)
-        for path in subgraphs:
-            if len(path) > 1:
-                sg = G.subgraph(path)
-                v = self._subgraph_in_gt_exact(sg, gt_G)
-                quant.append(v)
+        # A path subgraph of G is in gt_G iff gt_G induces the same labelled
+        # edges on its nodes. Those nodes then form a path in gt_G too, so
+        # membership reduces to a lookup in gt_G's path signatures.
+        gt_signatures = self.path_index(gt_G).signature_set
+        quant = [s in gt_signatures for s in self.path_index(G).signatures]
 
         if len(quant) == 0:
             return 0
 
         return sum(quant) / len(quant)
 
-    @staticmethod
-    def _subgraph_in_gt_exact(subgraph, gt_G):
-        """Check if the subgraph is present in the host graph."""
-
-        def node_match(n1, n2):
-            nam1 = n1.get("attr", {}).get("name", None)
-            nam2 = n2.get("attr", {}).get("name", None)
-            return (nam1 == nam2) and (nam1 is not None)
-
-        sg = gt_G.subgraph(subgraph.nodes)
-        if nx.is_isomorphic(sg, subgraph, node_match=node_match):
-            return True
-        return False
-
     @staticmethod
     def _prune(G):
         """Drop all nodes with outdeg==0."""
@@ -102,17 +94,9 @@ class GraphEval(BaseModel):
                 pruned.remove_node(node)
         return pruned
 
-    @staticmethod
-    def _get_paths(G):
-        """Get all simple paths in the graph."""
-        paths = []
-        for n0 in G.nodes:
-            for n1 in G.nodes:
-                if n0 != n1:
-                    if nx.has_path(G, n0, n1):
-                        ps = nx.all_simple_paths(G, source=n0, target=n1)
-                        paths += list(ps)
-        return paths
+    def _get_paths(self, G):
+        """Get all simple paths in the graph (memoized per graph)."""
+        return self.path_index(G).paths
 
     def _compare_porder_0(self, G, gt_G):
         """Compare the partial order of the graphs."""
@@ -147,13 +131,22 @@ class POSet(BaseModel):
     """A partially ordered set."""
 
     path: nx.DiGraph
+    _closure: tuple | None = PrivateAttr(default=None)
 
     class Config:
         arbitrary_types_allowed = True
 
+    @property
+    def closure(self):
+        """Node index and transitive closure matrix, computed once."""
+        if self._closure is None:
+            self._closure = reach_matrix(self.path)
+        return self._closure
+
     def gt(self, a, b):
         """Check if a is greater than b."""
-        return nx.has_path(self.path, a, b)
+        index, reach = self.closure
+        return bool(reach[index[a], index[b]])
 
     def iso(self, _poset):
         """Check if this poset contains _poset."""
@@ -166,13 +159,11 @@ class POSet(BaseModel):
         ):
             return False
 
-        # Else, check that the gt relation is preserved for each edge in _poset
-        for i in _poset.path.nodes:
-            for j in _poset.path.nodes:
-                if i != j:
-                    if not self.gt(i, j) == _poset.gt(i, j):
-                        return False
-        return True
+        # Else, check that the gt relation is preserved for each pair in _poset
+        index, reach = self.closure
+        _index, _reach = _poset.closure
+        idx = [index[n] for n in _index]
+        return bool(np.array_equal(reach[np.ix_(idx, idx)], _reach))
 
 
 if __name__ == "__main__":
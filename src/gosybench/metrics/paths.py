@@ -0,0 +1,182 @@
+"""Path enumeration engine shared by the GraphEval comparisons."""
+
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Hashable, List, Optional, Set, Tuple
+
+import networkx as nx
+import numpy as np
+
+from gosybench.logger import setup_logger
+
+logger = setup_logger(__package__)
+
+
+def reach_matrix(G: nx.DiGraph) -> Tuple[Dict[Any, int], np.ndarray]:
+    """Compute the transitive closure of G as a boolean matrix.
+
+    Returns a mapping node -> row/column and the matrix R, where R[i, j] is
+    True iff there is a path from node i to node j (R[i, i] is always True,
+    as in nx.has_path). Strongly connected components are condensed first,
+    so the closure is built in one reverse-topological pass.
+    """
+    index = {n: i for i, n in enumerate(G.nodes)}
+    reach = np.eye(len(index), dtype=bool)
+
+    # Fast path for DAGs (the common case, and always the case for path
+    # subgraphs of DAGs): Kahn's algorithm on integer adjacency lists, which
+    # avoids the per-call overhead of networkx algorithms on subgraph views.
+    succ = [[index[v] for v in G.succ[u]] for u in index]
+    indeg = [0] * len(index)
+    for ss in succ:
+        for j in ss:
+            indeg[j] += 1
+    order = [i for i, d in enumerate(indeg) if d == 0]
+    for i in order:
+        for j in succ[i]:
+            indeg[j] -= 1
+            if indeg[j] == 0:
+                order.append(j)
+
+    if len(order) == len(index):
+        for i in reversed(order):
+            row = reach[i]
+            for j in succ[i]:
+                row |= reach[j]
+        return index, reach
+
+    C = nx.condensation(G)
+    comp_reach = {}
+    for c in reversed(list(nx.topological_sort(C))):
+        rows = [index[n] for n in C.nodes[c]["members"]]
+        row = np.zeros(len(index), dtype=bool)
+        row[rows] = True
+        for s in C.successors(c):
+            row |= comp_reach[s]
+        comp_reach[c] = row
+        reach[rows] = row
+    return index, reach
+
+
+class PathIndex:
+    """Precomputed path structures for a single graph.
+
+    All structures are computed lazily and kept for the lifetime of the index,
+    so every comparison run against the same graph shares them.
+    """
+
+    def __init__(self, G: nx.DiGraph):
+        self.graph = G
+        self._paths: Optional[List[list]] = None
+        self._signatures: Optional[List[FrozenSet]] = None
+        self._signature_set: Optional[Set[FrozenSet]] = None
+
+    @property
+    def paths(self) -> List[list]:
+        """All simple paths with at least two nodes.
+
+        The returned list is shared between callers and must not be mutated.
+        """
+        if self._paths is None:
+            if nx.is_directed_acyclic_graph(self.graph):
+                self._paths = self._dag_paths(self.graph)
+            else:
+                self._paths = self._dfs_paths(self.graph)
+            logger.debug(
+                f"Enumerated {len(self._paths)} paths in {self.graph}"
+            )
+        return self._paths
+
+    def signature(self, path: list) -> FrozenSet:
+        """Canonical signature of the subgraph induced by a path.
+
+        Nodes are identified by key, so two induced subgraphs match exactly
+        (as labelled graphs) iff their edge sets are equal.
+        """
+        nodes = set(path)
+        succ = self.graph.succ
+        return frozenset((u, v) for u in path for v in succ[u] if v in nodes)
+
+    @property
+    def signatures(self) -> List[FrozenSet]:
+        """Signatures of all paths, aligned with self.paths."""
+        if self._signatures is None:
+            self._signatures = [self.signature(p) for p in self.paths]
+        return self._signatures
+
+    @property
+    def signature_set(self) -> Set[FrozenSet]:
+        """Set of path signatures, for O(1) membership queries."""
+        if self._signature_set is None:
+            self._signature_set = set(self.signatures)
+        return self._signature_set
+
+    @staticmethod
+    def _dag_paths(G: nx.DiGraph) -> List[list]:
+        """Enumerate paths in a DAG with one reverse-topological pass.
+
+        The paths starting at a node are the node itself, prepended to every
+        path starting at one of its successors. Suffixes are therefore
+        computed once per node instead of once per (source, target) pair.
+        """
+        suffixes: dict = {}
+        for n in reversed(list(nx.topological_sort(G))):
+            ps = [(n,)]
+            for s in G.successors(n):
+                ps.extend((n,) + p for p in suffixes[s])
+            suffixes[n] = ps
+
+        return [list(p) for n in G.nodes for p in suffixes[n] if len(p) > 1]
+
+    @staticmethod
+    def _dfs_paths(G: nx.DiGraph) -> List[list]:
+        """Enumerate simple paths in a general digraph with one DFS per node."""
+        paths = []
+        for n0 in G.nodes:
+            path = [n0]
+            visited = {n0}
+            stack = [iter(G.successors(n0))]
+            while stack:
+                child = next(stack[-1], None)
+                if child is None:
+                    stack.pop()
+                    visited.discard(path.pop())
+                elif child not in visited:
+                    path.append(child)
+                    visited.add(child)
+                    paths.append(list(path))
+                    stack.append(iter(G.successors(child)))
+        return paths
+
+
+class PathIndexCache:
+    """Memoize PathIndex objects by graph structure.
+
+    Graphs are keyed by their node and edge sets, so structurally identical
+    graphs (e.g. the same graph seen by several comparisons) share an index.
+    """
+
+    def __init__(self, maxsize: int = 8):
+        self.maxsize = maxsize
+        self._cache: OrderedDict = OrderedDict()
+
+    def __call__(self, G: nx.DiGraph) -> PathIndex:
+        """Return the PathIndex of G, building it on first use."""
+        key = self.graph_key(G)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        index = PathIndex(G)
+        self._cache[key] = index
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return index
+
+    @staticmethod
+    def graph_key(G: nx.DiGraph) -> Hashable:
+        """Structural key of a graph."""
+        return frozenset(G.nodes), frozenset(G.edges)
+
+    def clear(self):
+        """Drop all cached indices."""
+        self._cache.clear()
@@ -0,0 +1,283 @@
+"""Compact, memory-mappable on-disk format for synthesis graphs.
+
+A graph file holds a JSON header followed by raw NumPy arrays:
+
+    strings, string_offsets   deduplicated table of JSON-encoded values;
+                              value i spans offsets[i]:offsets[i + 1]
+    nodes                     (N,) string ids of the node keys
+    edges                     (E, 2) node indices
+    node:<col>, edge:<col>    (N,) / (E,) string ids of attribute values
+    product:<col>             (P,) string ids of product fields
+
+Node, edge and product attributes are stored column-wise: nested dicts are
+flattened into one column per key path, and each value is a string id
+(-1 when the attribute is missing). Values are decoded on demand, so
+with mmap only the parts of the table that are used are read. No pickle is
+involved in loading.
+
+Values are JSON types, tuples, and dicts with keys of those types; tuples
+and non-string keys are tagged so that they load back unchanged. Other
+types raise TypeError on save.
+"""
+
+import json
+import os
+import pickle
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+
+MAGIC = b"GOSYG002"
+_TUPLE = "__tuple__"
+_ITEMS = "__items__"
+ALIGN = 8
+
+
+class _StringTable:
+    """Deduplicated table of JSON-encoded values."""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+
+    def add(self, value: Any) -> int:
+        s = json.dumps(_encode(value), sort_keys=True, ensure_ascii=False)
+        return self.ids.setdefault(s, len(self.ids))
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        encoded = [s.encode("utf-8") for s in self.ids]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(b) for b in encoded])
+        return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+class _Strings:
+    """Values of a string table, decoded on first access.
+
+    Hashable values are memoized; lists and dicts are decoded again on
+    each access, so rows never share mutable values.
+    """
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+        self._memo: Dict[int, Any] = {}
+
+    def __getitem__(self, i: int) -> Any:
+        if i in self._memo:
+            return self._memo[i]
+        span = self.blob[self.offsets[i] : self.offsets[i + 1]]
+        value = _decode(json.loads(span.tobytes()))
+        try:
+            hash(value)
+        except TypeError:
+            return value
+        self._memo[i] = value
+        return value
+
+
+def _encode(value: Any) -> Any:
+    """Make value JSON-serializable, tagging tuples and non-str keys."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, list):
+        return [_encode(v) for v in value]
+    if isinstance(value, tuple):
+        return {_TUPLE: [_encode(v) for v in value]}
+    if isinstance(value, dict):
+        if all(isinstance(k, str) for k in value) and not (
+            _TUPLE in value or _ITEMS in value
+        ):
+            return {k: _encode(v) for k, v in value.items()}
+        return {_ITEMS: [[_encode(k), _encode(v)] for k, v in value.items()]}
+    raise TypeError(
+        f"Cannot save a value of type {type(value).__name__}: {value!r}."
+    )
+
+
+def _decode(value: Any) -> Any:
+    """Inverse of _encode."""
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    if isinstance(value, dict):
+        if len(value) == 1 and _TUPLE in value:
+            return tuple(_decode(v) for v in value[_TUPLE])
+        if len(value) == 1 and _ITEMS in value:
+            return {_decode(k): _decode(v) for k, v in value[_ITEMS]}
+        return {k: _decode(v) for k, v in value.items()}
+    return value
+
+
+def _flatten(d: dict, prefix: tuple = ()) -> Dict[tuple, Any]:
+    """Flatten nested dicts into {key path: value}. Lists are kept whole."""
+    flat = {}
+    for k, v in d.items():
+        if isinstance(v, dict) and v and all(isinstance(x, str) for x in v):
+            flat.update(_flatten(v, prefix + (k,)))
+        else:
+            flat[prefix + (k,)] = v
+    return flat
+
+
+def _columns(items: List[dict], table: _StringTable) -> Dict[str, np.ndarray]:
+    """Encode a list of attribute dicts as columns of string ids."""
+    flat = [_flatten(d) for d in items]
+    names = {p: json.dumps(_encode(p)) for f in flat for p in f}
+    cols = {}
+    for p in sorted(names, key=names.__getitem__):
+        col = np.full(len(items), -1, dtype=np.int32)
+        for i, f in enumerate(flat):
+            if p in f:
+                col[i] = table.add(f[p])
+        cols[names[p]] = col
+    return cols
+
+
+def _rows(n: int, cols: Dict[str, np.ndarray], values: _Strings) -> List[dict]:
+    """Decode columns of string ids back into attribute dicts."""
+    rows: List[dict] = [{} for _ in range(n)]
+    for name, col in cols.items():
+        *path, last = _decode(json.loads(name))
+        for d, i in zip(rows, col.tolist()):
+            if i >= 0:
+                for k in path:
+                    d = d.setdefault(k, {})
+                d[last] = values[i]
+    return rows
+
+
+def save_graph(
+    G: nx.DiGraph, path: str, products: Optional[List[dict]] = None
+):
+    """Write G (and optionally a list of product dicts) to path."""
+    table = _StringTable()
+    nodes = list(G.nodes)
+    index = {n: i for i, n in enumerate(nodes)}
+
+    arrays = {
+        "nodes": np.array([table.add(n) for n in nodes], dtype=np.int32),
+        "edges": np.array(
+            [(index[u], index[v]) for u, v in G.edges], dtype=np.int32
+        ).reshape(-1, 2),
+    }
+    for k, col in _columns([G.nodes[n] for n in nodes], table).items():
+        arrays[f"node:{k}"] = col
+    for k, col in _columns([G.edges[e] for e in G.edges], table).items():
+        arrays[f"edge:{k}"] = col
+    for k, col in _columns(products or [], table).items():
+        arrays[f"product:{k}"] = col
+    arrays["strings"], arrays["string_offsets"] = table.arrays()
+
+    header: Dict[str, Any] = {
+        "graph": _encode(G.graph),
+        "nproducts": None if products is None else len(products),
+        "arrays": {},
+    }
+    offset = 0
+    for k, a in arrays.items():
+        header["arrays"][k] = {
+            "dtype": a.dtype.str,
+            "shape": a.shape,
+            "offset": offset,
+        }
+        offset += -(-a.nbytes // ALIGN) * ALIGN
+
+    hbytes = json.dumps(header).encode("utf-8")
+    hbytes += b" " * (-(len(MAGIC) + 8 + len(hbytes)) % ALIGN)
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.int64(len(hbytes)).tobytes())
+        f.write(hbytes)
+        for a in arrays.values():
+            b = np.ascontiguousarray(a).tobytes()
+            f.write(b + b"\0" * (-len(b) % ALIGN))
+
+
+def load_graph(
+    path: str, mmap: bool = True, attrs: bool = True
+) -> Tuple[nx.DiGraph, Optional[List[dict]]]:
+    """Read a graph written by save_graph. Returns (graph, products).
+
+    With attrs=False only the structure (node keys and edges) is decoded;
+    attributes and products are skipped.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a GOSyBench graph file.")
+        hlen = int(np.frombuffer(f.read(8), dtype=np.int64)[0])
+        header = json.loads(f.read(hlen))
+        start = len(MAGIC) + 8 + hlen
+
+    if mmap:
+        buf = np.memmap(path, dtype=np.uint8, mode="r")
+    else:
+        buf = np.fromfile(path, dtype=np.uint8)
+
+    arrays = {}
+    for k, meta in header["arrays"].items():
+        dtype = np.dtype(meta["dtype"])
+        count = int(np.prod(meta["shape"]))
+        o = start + meta["offset"]
+        arrays[k] = np.frombuffer(
+            buf, dtype=dtype, count=count, offset=o
+        ).reshape(meta["shape"])
+
+    values = _Strings(arrays["strings"], arrays["string_offsets"])
+    edges = arrays["edges"].tolist()
+    nodes = [values[i] for i in arrays["nodes"].tolist()]
+    if not attrs:
+        G = nx.DiGraph()
+        G.add_nodes_from(nodes)
+        G.add_edges_from((nodes[u], nodes[v]) for u, v in edges)
+        return G, None
+
+    def cols(prefix):
+        return {
+            k[len(prefix) :]: a
+            for k, a in arrays.items()
+            if k.startswith(prefix)
+        }
+
+    nattrs = _rows(len(nodes), cols("node:"), values)
+    eattrs = _rows(len(edges), cols("edge:"), values)
+
+    G = nx.DiGraph(**_decode(header["graph"]))
+    G.add_nodes_from(zip(nodes, nattrs))
+    G.add_edges_from(
+        (nodes[u], nodes[v], a) for (u, v), a in zip(edges, eattrs)
+    )
+
+    products = None
+    if header["nproducts"] is not None:
+        products = _rows(header["nproducts"], cols("product:"), values)
+    return G, products
+
+
+def convert_pickle(src: str, dst: Optional[str] = None) -> str:
+    """Convert a pickled graph (as read by STree.from_pickle).
+
+    Only the graph is stored, so STree.load derives the products exactly as
+    STree.from_pickle does. Returns the path of the new file (src with a
+    .gosyg extension by default).
+    """
+    dst = dst or os.path.splitext(src)[0] + ".gosyg"
+    with open(src, "rb") as f:
+        save_graph(pickle.load(f), dst)
+    return dst
+
+
+if __name__ == "__main__":
+    # Convert every pickle given on the command line (or found in a dir)
+    for arg in sys.argv[1:]:
+        if os.path.isdir(arg):
+            srcs = [
+                os.path.join(root, f)
+                for root, _, files in os.walk(arg)
+                for f in files
+                if f.endswith(".pickle")
+            ]
+        else:
+            srcs = [arg]
+        for src in srcs:
+            print(f"{src} -> {convert_pickle(src)}")
@@ -8,6 +8,8 @@ from typing import Any, List, Optional, Tuple
 import fitz
 from pydantic import BaseModel
 
+from .pages import DocPages
+
 
 class ResearchDoc(BaseModel):
     """A research paper and its SI."""
@@ -18,6 +20,10 @@ class ResearchDoc(BaseModel):
     paper: str = ""
     si: str = ""
     si_dict: dict = {}
+    paper_pages: Optional[DocPages] = None
+    si_pages: Optional[DocPages] = None
+    si_paths: List[str] = []
+    parse_cache: bool = False
     logger: Any = None
 
     class Config:
@@ -26,50 +32,69 @@ class ResearchDoc(BaseModel):
         arbitrary_types_allowed = True
 
     @classmethod
-    def from_dir(cls, paper_dir: str, logger: Any = None):
+    def from_dir(
+        cls, paper_dir: str, logger: Any = None, parse_cache: bool = False
+    ):
         """
         Initialize ResearchDoc object.
 
         paper_dir: directory containing the paper and SI.
             SI must be named si_0.pdf,
             paper must be named paper.pdf.
+        parse_cache: read/write parsed pages from/to a cache file next to
+            each pdf, keyed by the pdf's content hash (see DocPages.open).
         """
         paper_path = os.path.join(paper_dir, "paper.pdf")
-        paper_fitz, paper_text = ResearchDoc.load(paper_path)
-        si_fitz, si_text = ResearchDoc.load_si(paper_dir)
-        return cls(
+        paper_pages = DocPages.open([paper_path], cache=parse_cache)
+        si_paths = ResearchDoc.si_files(paper_dir)
+        si_pages = DocPages.open(si_paths, cache=parse_cache)
+        doc = cls(
             doc_src=paper_dir,
-            fitz_paper=paper_fitz,
-            fitz_si=si_fitz,
-            paper=paper_text,
-            si=si_text,
+            fitz_paper=paper_pages.doc,
+            fitz_si=si_pages.doc,
+            paper=paper_pages.text(),
+            si=si_pages.text(),
+            paper_pages=paper_pages,
+            si_pages=si_pages,
+            si_paths=si_paths,
+            parse_cache=parse_cache,
             logger=logger,
         )
+        paper_pages.persist()
+        si_pages.persist()
+        return doc
 
     @classmethod
     def load(cls, path: str) -> Tuple[fitz.Document, str]:
         """Load a PDF as a string."""
         doc = fitz.open(path)
-        text = ""
-        for p in doc:
-            text += p.get_text()
-        return doc, text
+        return doc, DocPages(doc).text()
 
     @classmethod
     def load_si(cls, path: str) -> Tuple[fitz.Document, str]:
         """Load an SI from a directory, potentially multiple files."""
+        doc, _ = cls.open_si(path)
+        return doc, DocPages(doc).text()
+
+    @classmethod
+    def open_si(cls, path: str) -> Tuple[fitz.Document, List[str]]:
+        """Merge the SI files in a directory into one document.
+
+        Returns the document and the paths of the merged files.
+        """
         doc = fitz.open()
-        text = ""
 
-        si_paths = [os.path.join(path, f) for f in os.listdir(path)]
+        si_paths = cls.si_files(path)
         for si in si_paths:
-            if re.match(r".*si_\d+\.pdf", si):
-                doc.insert_file(si)
+            doc.insert_file(si)
 
-        for p in doc:
-            text += p.get_text()
+        return doc, si_paths
 
-        return doc, text
+    @classmethod
+    def si_files(cls, path: str) -> List[str]:
+        """Paths of the SI files in a directory."""
+        si_paths = [os.path.join(path, f) for f in os.listdir(path)]
+        return [si for si in si_paths if re.match(r".*si_\d+\.pdf$", si)]
 
     def acquire_context(
         self,
@@ -0,0 +1,53 @@
+"""Persistent cache for rendered pdf pages."""
+
+import hashlib
+import os
+import tempfile
+from typing import Optional
+
+
+class RenderCache:
+    """Content-addressed store of rendered page images.
+
+    Entries are keyed by the content hash of the pdf, the page number and
+    the resolution, so a page is rendered once whatever path the pdf is
+    read from and whatever model the image is sent to.
+    """
+
+    def __init__(
+        self,
+        directory: str = os.path.join("~", ".cache", "jasyntho", "renders"),
+    ):
+        self.directory = os.path.expanduser(directory)
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key(pdf_hash: str, page: int, dpi: int) -> str:
+        """Key of page (of the pdf with content hash pdf_hash) at dpi."""
+        return hashlib.sha256(f"{pdf_hash}:{page}:{dpi}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".jpg")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Cached image, or None."""
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def set(self, key: str, image: bytes):
+        """Store an image; concurrent writers never leave partial files."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(image)
+        os.replace(tmp, path)
+
+    def __len__(self) -> int:
+        return sum(
+            len([f for f in files if f.endswith(".jpg")])
+            for _, _, files in os.walk(self.directory)
+        )
@@ -0,0 +1,310 @@
+"""Per-document cache of the text and layout of pdf pages."""
+
+import hashlib
+import json
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import fitz  # type: ignore
+
+# Bump when page extraction or paragraph segmentation changes, so that
+# parsed-document caches written by older versions are ignored.
+PARSER_VERSION = "2"
+
+
+class DocPages:
+    """Text, layout blocks and paragraphs of each page of a pdf.
+
+    The plain text of a page (get_text()) is read when first requested.
+    Blocks/lines/spans (get_text("dict"), without image data) are only
+    decoded for pages whose paragraphs are parsed, and paragraphs keep the
+    per-page result of segmentation. Each is computed at most once.
+    release() drops the blocks of a page whose paragraphs are known, so
+    streaming through a document holds the blocks of one page at a time.
+
+    In the parsed-document cache, the blocks of each page are stored
+    compressed and only decoded when requested, so loading the text and
+    paragraphs of a cached document is fast.
+
+    path: file holding the same pages as doc (defaults to doc.name).
+    files: the pdf files the pages come from, as (path, first page, pages).
+    """
+
+    def __init__(self, doc: fitz.Document, path: Optional[str] = None):
+        self.doc = doc
+        self.path = path or doc.name
+        self.files: List[Tuple[str, int, int]] = []
+        if self.path:
+            self.files.append((self.path, 0, doc.page_count))
+        self._text: List[Optional[str]] = [None] * doc.page_count
+        self._blocks: List[Union[None, bytes, List[dict]]] = [
+            None
+        ] * doc.page_count
+        self._pars: List[Optional[list]] = [None] * doc.page_count
+        # Cached source files: (pdf path, content hash, first page, pages)
+        self._sources: List[Tuple[str, str, int, int]] = []
+        self._hashes: Dict[str, str] = {}
+        self._dirty = False
+
+    @classmethod
+    def open(cls, paths: List[str], cache: bool = False) -> "DocPages":
+        """Open pdfs, merged into one document in the given order.
+
+        With cache, parsed pages are read from a file next to each pdf
+        (see cache_path) when its content hash and PARSER_VERSION match.
+        persist() writes them back.
+        """
+        if len(paths) == 1:
+            doc = fitz.open(paths[0])
+        else:
+            doc = fitz.open()
+            for path in paths:
+                doc.insert_file(path)
+        pages = cls(doc, paths[0] if len(paths) == 1 else None)
+
+        pages.files = []
+        start = 0
+        for path in paths:
+            with fitz.open(path) as src:
+                n = src.page_count
+            pages.files.append((path, start, n))
+            if cache:
+                key = pages.file_hash(path)
+                pages._sources.append((path, key, start, n))
+                pages._read_cache(path, key, start, n)
+            start += n
+        return pages
+
+    def locate(self, i: int) -> Tuple[Optional[str], int]:
+        """File and page number (in that file) of page i.
+
+        The file is None if the page does not come from a file.
+        """
+        for path, start, n in self.files:
+            if start <= i < start + n:
+                return path, i - start
+        return None, i
+
+    def file_range(self, path: str) -> Optional[Tuple[int, int]]:
+        """Pages [start, end) that come from the file at path, if any."""
+        for p, start, n in self.files:
+            if os.path.abspath(p) == os.path.abspath(path):
+                return start, start + n
+        return None
+
+    def file_hash(self, path: str) -> str:
+        """Content hash of one of the files, computed once."""
+        if path not in self._hashes:
+            self._hashes[path] = _file_hash(path)
+        return self._hashes[path]
+
+    @staticmethod
+    def cache_path(pdf_path: str) -> str:
+        """Path of the parsed-document cache of a pdf."""
+        return pdf_path + ".parsed"
+
+    def _read_cache(self, path: str, key: str, start: int, n: int):
+        """Fill pages [start, start + n) from the cache of path, if valid.
+
+        The file is a JSON header line (version, content hash, page texts,
+        paragraphs and the sizes of the page blocks, 0 if not stored),
+        followed by the zlib-compressed JSON blocks of each page.
+        """
+        try:
+            with open(self.cache_path(path), "rb") as f:
+                header = json.loads(f.readline())
+                blob = f.read()
+        except (OSError, ValueError):
+            return
+        if (
+            header.get("version") != PARSER_VERSION
+            or header.get("sha256") != key
+            or len(header["text"]) != n
+        ):
+            return
+        offsets = [0] + list(accumulate(header["sizes"]))
+        # Blocks stay compressed until requested
+        self._blocks[start : start + n] = [
+            blob[a:b] if b > a else None
+            for a, b in zip(offsets[:-1], offsets[1:])
+        ]
+        self._text[start : start + n] = header["text"]
+        self._pars[start : start + n] = header["paragraphs"]
+
+    def persist(self):
+        """Write the caches of source files whose text is extracted."""
+        if not self._dirty:
+            return
+        for path, key, start, n in self._sources:
+            text = self._text[start : start + n]
+            if any(t is None for t in text):
+                continue
+            blocks = [
+                _compress(b) if isinstance(b, list) else b or b""
+                for b in self._blocks[start : start + n]
+            ]
+            header = {
+                "version": PARSER_VERSION,
+                "sha256": key,
+                "text": text,
+                "paragraphs": self._pars[start : start + n],
+                "sizes": [len(b) for b in blocks],
+            }
+            tmp = self.cache_path(path) + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(json.dumps(header).encode("utf-8") + b"\n")
+                f.write(b"".join(blocks))
+            os.replace(tmp, self.cache_path(path))
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._text)
+
+    def text(self, i: Optional[int] = None) -> str:
+        """Plain text of page i, or of the whole document."""
+        if i is None:
+            return "".join(self.text(j) for j in range(len(self)))
+        text = self._text[i]
+        if text is None:
+            text = self._text[i] = _extract_text(self.doc[i])
+            self._dirty = True
+        return text
+
+    def blocks(self, i: int) -> List[dict]:
+        """Layout blocks of page i, as in get_text("dict")["blocks"]."""
+        blocks = self._blocks[i]
+        if blocks is None:
+            blocks = self._blocks[i] = _extract_blocks(self.doc[i])
+            self._dirty = True
+        elif isinstance(blocks, bytes):
+            blocks = self._blocks[i] = json.loads(zlib.decompress(blocks))
+        return blocks
+
+    def paragraphs(self, i: int, segment: Callable[[List[dict]], list]):
+        """Paragraph fragments of page i, as split by segment(blocks)."""
+        pars = self._pars[i]
+        if pars is None:
+            pars = self._pars[i] = segment(self.blocks(i))
+            self._dirty = True
+        return pars
+
+    def release(self, i: int):
+        """Drop the blocks of page i once its paragraphs are known.
+
+        Blocks that were not persisted yet are not written to the cache.
+        """
+        if self._pars[i] is not None:
+            self._blocks[i] = None
+
+    def retained(self) -> int:
+        """Number of pages whose blocks are held in memory."""
+        return sum(b is not None for b in self._blocks)
+
+    def extract_all(
+        self, workers: int = 1, start: int = 0, end: Optional[int] = None
+    ):
+        """Extract the blocks of pages in [start, end) not yet segmented.
+
+        With workers > 1, in a process pool where each worker opens the
+        source file of its pages itself (see locate); pages that do not
+        come from a file are extracted here.
+        """
+        end = len(self) if end is None else end
+        todo = [
+            i
+            for i in range(start, end)
+            if self._blocks[i] is None and self._pars[i] is None
+        ]
+        located = [(i, *self.locate(i)) for i in todo]
+        in_files = [(i, f, j) for i, f, j in located if f is not None]
+        if workers <= 1 or len(in_files) < 2:
+            in_files = []
+        pooled = {i for i, _, _ in in_files}
+        for i in todo:
+            if i not in pooled:
+                self.blocks(i)
+        if not in_files:
+            return
+
+        # Several ranges per worker, to balance uneven pages
+        size = max(1, -(-len(in_files) // (4 * workers)))
+        chunks = [
+            in_files[k : k + size] for k in range(0, len(in_files), size)
+        ]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(
+                _extract_pages,
+                [[(f, j) for _, f, j in c] for c in chunks],
+            )
+            for chunk, blocks in zip(chunks, results):
+                for (i, _, _), b in zip(chunk, blocks):
+                    self._blocks[i] = b
+        self._dirty = True
+
+
+class PageRange:
+    """View of the pages [start, end) of a DocPages; nothing is copied."""
+
+    def __init__(
+        self, pages: DocPages, start: int = 0, end: Optional[int] = None
+    ):
+        self.pages = pages
+        self.start = start
+        self.end = len(pages) if end is None else end
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def __repr__(self) -> str:
+        return f"PageRange({self.pages.path!r}, {self.start}, {self.end})"
+
+    def text(self) -> str:
+        """Plain text of the pages in the range."""
+        return "".join(self.pages.text(i) for i in range(self.start, self.end))
+
+
+def _extract_text(page: fitz.Page) -> str:
+    """Plain text of a page."""
+    return page.get_text()
+
+
+def _extract_blocks(page: fitz.Page) -> List[dict]:
+    """Blocks of a page, without image data and masks."""
+    blocks = page.get_text("dict")["blocks"]
+    for b in blocks:
+        for k in [k for k, v in b.items() if isinstance(v, bytes)]:
+            del b[k]
+    return blocks
+
+
+def _extract_pages(pages: List[Tuple[str, int]]) -> List[List[dict]]:
+    """Blocks of the given (pdf path, page number) pages."""
+    blocks = []
+    docs: Dict[str, fitz.Document] = {}
+    try:
+        for path, i in pages:
+            if path not in docs:
+                docs[path] = fitz.open(path)
+            blocks.append(_extract_blocks(docs[path][i]))
+    finally:
+        for doc in docs.values():
+            doc.close()
+    return blocks
+
+
+def _compress(blocks: List[dict]) -> bytes:
+    """Compact, compressed JSON of page blocks."""
+    data = json.dumps(blocks, separators=(",", ":")).encode("utf-8")
+    return zlib.compress(data, 1)
+
+
+def _file_hash(path: str) -> str:
+    """sha256 of a file's content."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(2**20), b""):
+            h.update(chunk)
+    return h.hexdigest()
@@ -2,16 +2,22 @@
 
 import asyncio
 import base64
+import math
 import os
-from typing import Literal, Optional
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List, Literal, Optional, Set, Tuple, Union
 
+import fitz  # type: ignore
 import requests
 from dotenv import load_dotenv
-from openai import AsyncOpenAI, BadRequestError
-from pdf2image import convert_from_path
+from openai import BadRequestError
 from pydantic import BaseModel, Field, model_validator
 
+from jasyntho.document.cache import RenderCache
+from jasyntho.document.pages import DocPages, PageRange
 from jasyntho.document.synthpar import SynthParagraph
+from jasyntho.extract.clients import clients
 
 
 class Substance(BaseModel):
@@ -37,17 +43,69 @@ class VisionParser(BaseModel):
         ..., description="API key for the OpenAI API."
     )
 
-    def encode_image(self, image_path):
-        """Encode image to base64."""
-        with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode("utf-8")
+    dpi: int = Field(200, description="Resolution of the rendered pages.")
+    max_batches: int = Field(
+        4,
+        description="Maximum number of batches rendered or in flight at once.",
+    )
+    max_images: int = Field(
+        10, description="Maximum number of pages sent in one request."
+    )
+    max_input_tokens: int = Field(
+        20000,
+        description="Budget of prompt and image tokens of one request.",
+    )
+    workers: int = Field(1, description="Number of processes rendering pages.")
+    render_cache: Optional[RenderCache] = Field(
+        None, description="Cache of rendered pages, shared across runs."
+    )
+
+    class Config:
+        """Pydantic config."""
+
+        arbitrary_types_allowed = True
+
+    async def _render_cached(
+        self, pages: DocPages, i: int, pool: Optional[Executor] = None
+    ) -> bytes:
+        """JPEG of page i, from the render cache or rendered.
+
+        Pages of a pdf file are rendered in pool when given; each worker
+        opens the file itself.
+        """
+        path, local = pages.locate(i)
+        key = None
+        if path is not None and self.render_cache is not None:
+            key = self.render_cache.key(pages.file_hash(path), local, self.dpi)
+            image = self.render_cache.get(key)
+            if image is not None:
+                return image
 
-    def load_imagerange(self, pdf, indices):
-        """Load images from a range of pages."""
+        if path is not None and pool is not None:
+            loop = asyncio.get_running_loop()
+            image = await loop.run_in_executor(
+                pool, _render_file, path, local, self.dpi
+            )
+        else:
+            image = _render(pages.doc, i, self.dpi)
+
+        if key is not None:
+            self.render_cache.set(key, image)  # type: ignore
+        return image
+
+    async def load_imagerange(
+        self, pdf: PageRange, indices, pool: Optional[Executor] = None
+    ):
+        """Render a range of pages (relative to pdf.start) as messages."""
+        images = await asyncio.gather(
+            *[
+                self._render_cached(pdf.pages, pdf.start + i, pool)
+                for i in indices
+            ]
+        )
         img_messages = []
-        for i in indices:
-            img_path = f".tmp/page{i}.jpg"
-            base64_image = self.encode_image(img_path)
+        for image in images:
+            base64_image = base64.b64encode(image).decode("utf-8")
             img_messages.append(
                 {
                     "type": "image_url",
@@ -58,6 +116,43 @@ class VisionParser(BaseModel):
             )
         return img_messages
 
+    def page_tokens(self, doc: fitz.Document, i: int) -> int:
+        """Input tokens of page i as a rendered image."""
+        rect = doc[i].rect
+        scale = self.dpi / 72
+        return _image_tokens(rect.width * scale, rect.height * scale)
+
+    def create_batches(
+        self, pdf: PageRange, max_images: int, prgr_sep: str, overlap=1
+    ) -> List[Tuple[int, int]]:
+        """Pack consecutive pages (relative to pdf.start) into batches.
+
+        Each batch holds as many pages as fit in max_images and in the
+        max_input_tokens budget, with at least one page per batch.
+        Consecutive batches share overlap pages, so that reactions split
+        across pages are seen whole.
+        """
+        costs = [
+            self.page_tokens(pdf.pages.doc, pdf.start + i)
+            for i in range(len(pdf))
+        ]
+        budget = self.max_input_tokens - len(_prompt(prgr_sep)) // 4
+        N = len(costs)
+        batches: List[Tuple[int, int]] = []
+        start = 0
+        while start < N:
+            end, used = start, 0
+            while end < N and end - start < max_images:
+                if end > start and used + costs[end] > budget:
+                    break
+                used += costs[end]
+                end += 1
+            batches.append((start, end))
+            if end == N:
+                break
+            start = max(end - overlap, start + 1)
+        return batches
+
     def calc_cost(self, response):
         """Calculate the cost of a response."""
         intok = response.usage.prompt_tokens
@@ -71,14 +166,6 @@ class VisionParser(BaseModel):
         self, img_messages, model="gpt-4o", prgr_sep="##---##", client=None
     ):
         """Parse a batch of images."""
-
-        prompt = """These are some pages from the SI of an organic chemistry paper.
-        Describe all the reactions shown there, if any.
-        Separate each reaction with \"{}\", describe products and reactants for each reaction.
-        Ignore all characterization data. Consider work-up and purification as part of the same reaction.
-        Use the following format to represent the products and main reactants: {}.
-        Do not rewrite the reaction procedures, just describe the substances involved."""
-
         messages = [
             {
                 "role": "system",
@@ -89,7 +176,7 @@ class VisionParser(BaseModel):
                 "content": [
                     {
                         "type": "text",
-                        "text": prompt.format(prgr_sep, Substance.schema()),
+                        "text": _prompt(prgr_sep),
                     },
                     *img_messages,
                 ],
@@ -107,60 +194,60 @@ class VisionParser(BaseModel):
             print(f"Error in processing batch: {e}")
             return ""
 
-    def split_images(self, pdf):
-        """Split PDF into a sequence of images."""
-        images = convert_from_path(pdf)
-        # Store images into .tmp
-        os.makedirs(".tmp", exist_ok=True)
-        os.system("rm .tmp/*")  # Clear from previous runs
-
-        for i in range(len(images)):
-            images[i].save(f".tmp/page{i}.jpg", "JPEG")
-        return images
-
-    def create_overlapping_batches(self, N, batch_size, overlap):
-        """Create overlapping batches."""
-        start = 0
-        batches = []
-        while start < N:
-            end = start + batch_size
-            if end > N:
-                end = N
-            batches.append((start, end))
-            start += batch_size - overlap
-        return batches
-
     async def vision_parse(
-        self, pdf, batch_size=10, model="gpt-4o", prgr_sep="##---##"
+        self,
+        pdf: Union[str, PageRange],
+        batch_size: Optional[int] = None,
+        model="gpt-4o",
+        prgr_sep="##---##",
     ):
-        """Parse a PDF using vision models."""
-        images = self.split_images(pdf)
-        img_messages = []
-        N = len(images)
-        start = 0
-        client = AsyncOpenAI()
+        """Parse a PDF (a path, or a range of its pages) using vision models.
 
-        paragraphs = []
+        Pages are sent in overlapping batches of at most batch_size (by
+        default max_images) pages, within the max_input_tokens budget.
+        Reactions on the shared pages are described in two responses; such
+        near-duplicate paragraphs are merged (see dedup_paragraphs).
 
-        # divide the images into batches
-        indices = list(range(N))
-        tasks = []
+        Pages are rendered in memory, batch by batch, right before the batch
+        is sent. At most max_batches batches are held at once, so memory is
+        bounded by the batch size rather than the document size. With
+        workers > 1, pages are rendered in a process pool, so later batches
+        render while earlier ones are in flight. Rendered pages are read
+        from and written to render_cache, if set.
+        """
+        if isinstance(pdf, str):
+            pdf = PageRange(DocPages(fitz.open(pdf)))
+        N = len(pdf)
+        client = clients.get("openai", is_async=True)
+        sem = asyncio.Semaphore(self.max_batches)
+        pool = (
+            ProcessPoolExecutor(max_workers=self.workers)
+            if self.workers > 1
+            else None
+        )
 
-        for b0, b1 in self.create_overlapping_batches(
-            N, batch_size, overlap=1
-        ):
-            img_messages = self.load_imagerange(pdf, indices[b0:b1])
-            tasks.append(
-                self.vision_parse_batch(
+        async def parse_batch(b0, b1):
+            async with sem:
+                img_messages = await self.load_imagerange(
+                    pdf, range(b0, b1), pool
+                )
+                return await self.vision_parse_batch(
                     img_messages, model=model, prgr_sep=prgr_sep, client=client
                 )
-            )
 
-        responses = await asyncio.gather(*tasks)
-
-        for response in responses:
-            paragraphs += response.split(prgr_sep)
+        # divide the pages into batches
+        batches = self.create_batches(
+            pdf, batch_size or self.max_images, prgr_sep, overlap=1
+        )
+        try:
+            responses = await asyncio.gather(
+                *[parse_batch(b0, b1) for b0, b1 in batches]
+            )
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
 
+        paragraphs = dedup_paragraphs([r.split(prgr_sep) for r in responses])
         return [SynthParagraph(p) for p in paragraphs]
 
     @model_validator(mode="after")
@@ -171,3 +258,88 @@ class VisionParser(BaseModel):
         if self.api_key is None and self.ptype == "vision":
             raise ValueError("API key is required for vision parsing.")
         return self
+
+
+def dedup_paragraphs(
+    batches: List[List[str]], threshold: float = 0.8
+) -> List[str]:
+    """Concatenate the paragraphs of consecutive batches without duplicates.
+
+    Consecutive batches share a page, so reactions on it are described in
+    both responses. Paragraphs are fingerprinted by their set of word
+    3-grams; one whose Jaccard similarity to a paragraph of the previous
+    batch reaches threshold is merged into it, keeping the longer text.
+    Blank paragraphs are dropped.
+    """
+    out: List[str] = []
+    prev: List[Tuple[int, Set[tuple]]] = []
+    for batch in batches:
+        cur: List[Tuple[int, Set[tuple]]] = []
+        for text in batch:
+            shingles = _shingles(text)
+            if not shingles:
+                continue
+            match = next(
+                (
+                    k
+                    for k, (_, other) in enumerate(prev)
+                    if _jaccard(shingles, other) >= threshold
+                ),
+                None,
+            )
+            if match is None:
+                cur.append((len(out), shingles))
+                out.append(text)
+                continue
+            j, _ = prev.pop(match)
+            if len(text.strip()) > len(out[j].strip()):
+                out[j] = text
+            cur.append((j, shingles))
+        prev = cur
+    return out
+
+
+def _shingles(text: str, k: int = 3) -> Set[tuple]:
+    """Word k-grams of the normalized text (fewer words: the text itself)."""
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < k:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i : i + k]) for i in range(len(words) - k + 1)}
+
+
+def _jaccard(a: Set[tuple], b: Set[tuple]) -> float:
+    return len(a & b) / len(a | b)
+
+
+def _image_tokens(width: float, height: float) -> int:
+    """Input tokens of an image at high detail (OpenAI's tiling rule).
+
+    The image is fit in 2048x2048, its short side scaled down to 768, and
+    charged 170 tokens per 512px tile plus 85.
+    """
+    scale = min(1.0, 2048 / max(width, height))
+    scale *= min(1.0, 768 / (min(width, height) * scale))
+    tiles = math.ceil(width * scale / 512) * math.ceil(height * scale / 512)
+    return 170 * tiles + 85
+
+
+def _prompt(prgr_sep: str) -> str:
+    """Instructions sent with each batch of pages."""
+    prompt = """These are some pages from the SI of an organic chemistry paper.
+        Describe all the reactions shown there, if any.
+        Separate each reaction with \"{}\", describe products and reactants for each reaction.
+        Ignore all characterization data. Consider work-up and purification as part of the same reaction.
+        Use the following format to represent the products and main reactants: {}.
+        Do not rewrite the reaction procedures, just describe the substances involved."""
+    return prompt.format(prgr_sep, Substance.schema())
+
+
+def _render(doc: fitz.Document, i: int, dpi: int) -> bytes:
+    """Render page i of doc as JPEG."""
+    return doc[i].get_pixmap(dpi=dpi).tobytes("jpeg")
+
+
+def _render_file(path: str, i: int, dpi: int) -> bytes:
+    """Render page i of the pdf at path as JPEG (in a worker process)."""
+    with fitz.open(path) as doc:
+        return _render(doc, i, dpi)
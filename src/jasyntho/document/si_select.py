@@ -6,11 +6,30 @@ That is, the part containing the synthesis procedures.
 
 import os
 import re
+from typing import List, Union
 
+import fitz  # type: ignore
 import numpy as np
 from pydantic import BaseModel
 
 from .base import ResearchDoc
+from .pages import DocPages, PageRange
+
+TEXT_REGEX = r"[A-Z][a-z]"
+SPECIAL_REGEX = r"[a-zA-Z!@#$%^&*()\-_=+{}[\];:,.<>?/|~`]"
+
+
+def _byte_table(regex: str) -> np.ndarray:
+    """Lookup table of the ASCII bytes matched by a character class."""
+    table = np.zeros(256, dtype=bool)
+    for b in range(128):
+        table[b] = re.fullmatch(regex, chr(b)) is not None
+    return table
+
+
+_SPECIAL = _byte_table(SPECIAL_REGEX)
+_UPPER = _byte_table("[A-Z]")
+_LOWER = _byte_table("[a-z]")
 
 
 class SISplitter(BaseModel):
@@ -19,14 +38,14 @@ class SISplitter(BaseModel):
     plot: bool = False
     window_size: int = 20
     signal_threshold: float = 0.5
-    text_regex: str = r"[A-Z][a-z]"
-    special_regex: str = r"[a-zA-Z!@#$%^&*()\-_=+{}[\];:,.<>?/|~`]"
+    text_regex: str = TEXT_REGEX
+    special_regex: str = SPECIAL_REGEX
 
     sdict: dict = {}
     sents: list = []
     pages: tuple = (0, 0)
 
-    def select_relevant(self, doc: ResearchDoc):
+    def select_relevant(self, doc: ResearchDoc) -> PageRange:
         """Select the relevant part of the SI."""
         self.pages = self.find_pages(doc)
         return self.cut_si(doc)
@@ -61,34 +80,34 @@ class SISplitter(BaseModel):
         plt.savefig(os.path.join(src, "SIsignal.png"))
         plt.close("all")
 
-    def cut_si(self, doc: ResearchDoc):
-        """Slice the SI to the relevant part."""
+    def cut_si(self, doc: ResearchDoc) -> PageRange:
+        """Slice the SI to the relevant part.
+
+        Returns a view of the selected pages; the SI is not modified.
+        """
         p0, p1 = self.pages
         if p0 > p1:
             raise ValueError(f"Invalid page range {self.pages}.")
-        else:
-            doc.fitz_si.delete_pages(
-                from_page=p1 + 1, to_page=len(doc.fitz_si) - 1
-            )
-            if p0 != 0:
-                doc.fitz_si.delete_pages(from_page=0, to_page=p0 - 1)
-        return doc.fitz_si
+        pages = doc.si_pages or DocPages(doc.fitz_si)
+        return PageRange(pages, p0, p1 + 1)
 
     def map_ratio(self, doc: ResearchDoc):
         """Split the SI into sentences and calculate the ratio.
         Returns ratio: page for each sentence."""
-        self.sentence_dict(doc.fitz_si)
-        ratios = [self._ratio_si(s) for s in self.sents]
+        self.sentence_dict(doc.si_pages or doc.fitz_si)
+        ratios = self._ratios(self.sents)
         ratios = self._smooth_signal(ratios)
         return ratios
 
-    def sentence_dict(self, doc: ResearchDoc, split_pattern="\n"):
+    def sentence_dict(
+        self, doc: Union[DocPages, fitz.Document], split_pattern="\n"
+    ):
         """Create list of sentences and a dictionary mapping sentence idx to page."""
         self.sdict = {}
         self.sents = []
-        for p in doc:
-            p_number = p.number
-            sents = p.get_text().split(split_pattern)
+        pages = doc if isinstance(doc, DocPages) else DocPages(doc)
+        for p_number in range(len(pages)):
+            sents = pages.text(p_number).split(split_pattern)
             idict = {
                 i + len(self.sdict): p_number for i, s in enumerate(sents)
             }
@@ -96,6 +115,26 @@ class SISplitter(BaseModel):
             self.sents += sents
         return self.sdict
 
+    def _ratios(self, sents: List[str]) -> np.ndarray:
+        """Ratio of special characters to text of each sentence.
+
+        With the default regexes, characters are counted for all sentences
+        at once on the bytes of the joined text: the regexes only match
+        ASCII, so each match is one byte (two for text_regex).
+        """
+        if (self.text_regex, self.special_regex) != (
+            TEXT_REGEX,
+            SPECIAL_REGEX,
+        ):
+            return np.array([self._ratio_si(s) for s in sents])
+
+        buf = np.frombuffer("\n".join(sents).encode("utf-8"), np.uint8)
+        line = np.cumsum(buf == ord("\n"))  # sentence of each byte
+        spec = np.bincount(line[_SPECIAL[buf]], minlength=len(sents))
+        pairs = _UPPER[buf[:-1]] & _LOWER[buf[1:]]
+        text = np.bincount(line[:-1][pairs], minlength=len(sents))
+        return spec / (text + 1)
+
     def _ratio_si(self, sentence):
         """Calculate the ratio of special characters to text."""
         text = len(re.findall(self.text_regex, sentence))
@@ -105,24 +144,24 @@ class SISplitter(BaseModel):
     def _smooth_signal(self, ratios):
         """Smooth the signal using a moving average."""
         conv = np.convolve(ratios, np.ones(self.window_size), "valid")
-        conv = conv / np.mean(np.sort(conv)[-30:])  # normalize
+        top = conv if conv.size <= 30 else np.partition(conv, -30)[-30:]
+        conv = conv / np.mean(np.sort(top))  # normalize
         return conv
 
     def find_longest_true(self, bools):
-        """Find the longest sequence of True values."""
-        max_len = 0
-        max_start = 0
-        max_end = 0
-        start = 0
-        for i, b in enumerate(bools):
-            if b:
-                if start == 0:
-                    start = i
-            else:
-                if start != 0:
-                    if i - start > max_len:
-                        max_len = i - start
-                        max_start = start
-                        max_end = i
-                    start = 0
-        return max_start, max_end
+        """Find the longest sequence of True values.
+
+        Runs must be closed by a False, and the first value never starts a
+        run; the first longest run wins.
+        """
+        bools = np.array(bools, dtype=bool)
+        bools[:1] = False
+        edges = np.diff(np.concatenate(([0], bools.view(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        closed = ends < len(bools)
+        starts, ends = starts[closed], ends[closed]
+        if starts.size == 0:
+            return 0, 0
+        i = np.argmax(ends - starts)
+        return int(starts[i]), int(ends[i])
@@ -10,18 +10,21 @@ import logging
 import os
 import re
 from itertools import chain
-from typing import Dict, List, Literal, Optional
+from typing import AsyncIterator, Dict, List, Literal, Mapping, Optional, Union
 
-import fitz  # type: ignore
 import networkx as nx  # type: ignore
 from colorama import Fore  # type: ignore
+from pydantic import Field
 
 import wandb
-from jasyntho.extract import ExtractReaction, Product
+from gosybench.graph_index import ComponentIndex, DescendantIndex, ReachIndex
+from jasyntho.extract import ExtractionScheduler, ExtractReaction, Product
 from jasyntho.extract.extended import LabConnection
-from jasyntho.utils import RetrieveName, name_to_smiles
+from jasyntho.utils import NameRetrieval, SmilesResolver, default_resolver
 
 from .base import ResearchDoc
+from .cache import RenderCache
+from .pages import DocPages, PageRange
 from .parsing import VisionParser
 from .si_select import SISplitter
 from .synthpar import SynthParagraph
@@ -36,53 +39,77 @@ class SynthTree(ResearchDoc):
 
     products: List[Product] = []
     full_g: nx.DiGraph = nx.DiGraph()
-    reach_subgraphs: Dict[str, nx.DiGraph] = {}
+    reach_subgraphs: Mapping[str, nx.DiGraph] = {}
     rxn_extract: Optional[ExtractReaction] = None
+    page_workers: int = 1
+    smiles_resolver: SmilesResolver = Field(default_factory=default_resolver)
+    name_retrieval: NameRetrieval = Field(default_factory=NameRetrieval)
+    scheduler: ExtractionScheduler = Field(default_factory=ExtractionScheduler)
     paragraphs: List[SynthParagraph] = []
     raw_prods: List[Product] = []
     v: bool = True
+    _reach: Optional[ReachIndex] = None
+    _reach_sets: Dict[str, frozenset] = {}
 
     def gather_smiles(self):
-        """Gather all smiles from the products."""
+        """Gather all smiles from the products.
 
-        G = self.full_g
-
-        iupac = RetrieveName()
+        Names of all nodes with a reachable subgraph are resolved in one
+        batch. Names are then retrieved from the text of the nodes that
+        failed, all at once (see NameRetrieval), and resolved in a second
+        batch.
+        """
 
-        def get_iupac(subs, context):
-            try:
-                return iupac(subs, context).name
-            except Exception as e:
-                return []
+        G = self.full_g
 
-        def _size_reach_sg(G, node):
-            """Calc size of each reachable subgraph."""
-            rn = set(nx.bfs_tree(G, node))
-            return len(rn)
+        index = DescendantIndex(G)
 
+        nodes, complete = [], True
         for k, g in G.nodes.items():
-            l = _size_reach_sg(G, k)
-            if l > 1:
+            if index.has_descendants(k):
                 if "attr" not in g.keys():
-                    return None
-
-                name = g["attr"]["substance_name"]
-                labl = g["attr"]["reference_key"]
-                smi = name_to_smiles(name, labl)
-                if smi is None:
-                    # Try to get iupac name
-                    retrieved_names = get_iupac(k, context=g["attr"]["text"])
-                    print(f"key {k}. Got iupac name: {retrieved_names}")
-                    for n in retrieved_names:
-                        smi = name_to_smiles(n, labl)
-                        if smi:
-                            # Assign iupac and smiles attributes to node
-                            g["attr"]["iupac"] = n
-                            g["attr"]["smiles"] = smi
-                            break
-                if smi is not None:
-                    g["attr"]["smiles"] = smi
+                    complete = False
+                    break
+                nodes.append((k, g))
+
+        smiles = self.smiles_resolver.resolve_labeled(
+            [
+                (g["attr"]["substance_name"], g["attr"]["reference_key"])
+                for _, g in nodes
+            ]
+        )
 
+        # Try to get iupac names
+        unresolved = [k for (k, _), smi in zip(nodes, smiles) if smi is None]
+        retrieved = dict(
+            zip(
+                unresolved,
+                self.name_retrieval(
+                    [(k, G.nodes[k]["attr"]["text"]) for k in unresolved]
+                ),
+            )
+        )
+        for k, names in retrieved.items():
+            print(f"key {k}. Got iupac name: {names}")
+        pairs = [
+            (n, G.nodes[k]["attr"]["reference_key"])
+            for k, names in retrieved.items()
+            for n in names
+        ]
+        retrieved_smiles = iter(self.smiles_resolver.resolve_labeled(pairs))
+
+        for (k, g), smi in zip(nodes, smiles):
+            for n in retrieved.get(k, []):
+                smi_n = next(retrieved_smiles)
+                if smi is None and smi_n:
+                    # Assign iupac and smiles attributes to node
+                    g["attr"]["iupac"] = n
+                    smi = smi_n
+            if smi is not None:
+                g["attr"]["smiles"] = smi
+
+        if not complete:
+            return None
         self.full_g = G
         # TODO try this
 
@@ -97,34 +124,103 @@ class SynthTree(ResearchDoc):
                 print(f"Processing reachable subgraph from source node {k}")
                 new_connects[k] = lab_connect(k)
 
-        self.reach_subgraphs = self.partition(new_connects)
+        self.add_connections(new_connects)
+        self.reach_subgraphs = self.update_reach_subgraphs()
         return new_connects  # in case we want to use it later
 
     def partition(self, new_connects: Optional[dict] = None):
         """Merge and find all reachable subgraphs in paper.
         If dict of new connects is given, rewire the graph with new connections.
         """
-        prods = self.unique_keys(self.products)
-        self.full_g = self.get_full_graph(prods)
+        self.full_g = nx.DiGraph()
+        self.add_products(self.products)
 
         if new_connects is not None:
-            self.full_g = self._rewire(self.full_g, new_connects)
+            self.add_connections(new_connects)
 
-        reach_subgraph = SynthTree.get_reach_subgraphs(self.full_g)
-        return reach_subgraph
+        return self.update_reach_subgraphs()
 
-    def _rewire(self, full_graph, new_connects):
-        """Rewire the graph with new connections."""
-        # add new edges
+    def add_products(
+        self,
+        products: List[Product],
+        children_types: List[str] = ["reactant", "reagent", "catalyst"],
+    ) -> None:
+        """Add products to full_g, updating heads and reachable subgraphs.
+
+        A product whose key is already a product in full_g is skipped, so
+        the first product per key is kept, as in unique_keys.
+        """
+        G = self.full_g
+        nodes, edges = [], []
+        for p in products:
+            key = p.reference_key
+            if key is None:
+                print(f"\t- Error adding node: {p.note}")
+                continue
+            if key in G and "attr" in G.nodes[key]:
+                continue
+            self._add_product(G, p, children_types)
+            nodes.append(key)
+            edges += [
+                (key, c.reference_key)
+                for c in p.children
+                if c.role_in_reaction in children_types
+            ]
+        self._update_reach(nodes, edges)
+
+    def add_connections(self, new_connects: dict) -> None:
+        """Add the connections found by LabConnection to full_g.
+
+        new_connects maps a node to the LabConnection result for it; the
+        product of its second step becomes a predecessor of the node.
+        """
+        G = self.full_g
+        edges = []
         for k, res in new_connects.items():
             if res is not None:
                 prod_step = res["step 2"]
                 if prod_step is not None:
                     prod = prod_step.product.reference_key
-                    if prod in full_graph.nodes:
+                    if prod in G.nodes:
                         if k != prod:
-                            full_graph.add_edge(prod, k)
-        return full_graph
+                            G.add_edge(prod, k)
+                            edges.append((prod, k))
+        self._update_reach([], edges)
+
+    def update_reach_subgraphs(self) -> ComponentIndex:
+        """Reachable subgraph of each head of full_g, as get_reach_subgraphs.
+
+        Only the node sets of heads affected by products or connections
+        added since the last call are rebuilt.
+        """
+        reach = self._reach_index()
+        members = {
+            h: nodes
+            for h, nodes in self._reach_sets.items()
+            if reach.is_head(h) and h not in reach.changed
+        }
+        for h in reach.changed:
+            members[h] = frozenset(reach.members[h])
+        reach.changed.clear()
+        self._reach_sets = members
+        return ComponentIndex(self.full_g, members)
+
+    def _reach_index(self) -> ReachIndex:
+        """Reach index of full_g, built anew if full_g was replaced."""
+        if self._reach is None or self._reach.G is not self.full_g:
+            self._reach = ReachIndex(self.full_g)
+            self._reach_sets = {}
+            for n in self.full_g:
+                self.full_g.nodes[n]["is_head"] = self._reach.is_head(n)
+        return self._reach
+
+    def _update_reach(self, nodes: list, edges: list) -> None:
+        """Update the reach index and head flags after additions."""
+        reach = self._reach_index()
+        reach.update(nodes, edges)
+        G = self.full_g
+        for n in chain(nodes, chain.from_iterable(edges)):
+            G.nodes[n]["is_head"] = reach.is_head(n)
 
     @classmethod
     def unique_keys(cls, trees):
@@ -149,52 +245,69 @@ class SynthTree(ResearchDoc):
 
         # Add each node
         for p in product_list:
-            # Add node with properties
-            if p.reference_key is not None:
-                Gd.add_node(
-                    p.reference_key, attr=p.model_dump()  # type: ignore
-                )
-            else:
-                print(f"\t- Error adding node: {p.note}")
-            for c in p.children:
-                if c.role_in_reaction in children_types:
-                    Gd.add_edge(
-                        p.reference_key,
-                        c.reference_key,
-                        attr={"type": "lab reaction"},
-                    )
+            self._add_product(Gd, p, children_types)
         return Gd
 
+    @staticmethod
+    def _add_product(
+        Gd: nx.DiGraph,
+        p: Product,
+        children_types: List[str] = ["reactant", "reagent", "catalyst"],
+    ):
+        """Add a product node and the edges to its children."""
+        # Add node with properties
+        if p.reference_key is not None:
+            Gd.add_node(p.reference_key, attr=p.model_dump())  # type: ignore
+        else:
+            print(f"\t- Error adding node: {p.note}")
+        for c in p.children:
+            if c.role_in_reaction in children_types:
+                Gd.add_edge(
+                    p.reference_key,
+                    c.reference_key,
+                    attr={"type": "lab reaction"},
+                )
+
+    def _merge_product(
+        self, Gd: nx.DiGraph, p: Product, rank: tuple, owners: dict
+    ):
+        """Add p to Gd, keeping the first product (in document order) per key.
+
+        owners maps each reference key to the rank of the product it comes
+        from. Adding products in any order gives the same graph as
+        get_full_graph(unique_keys(products)). Products without a key are
+        skipped, as in add_products.
+        """
+        key = p.reference_key
+        if key is None:
+            print(f"\t- Error adding node: {p.note}")
+            return
+        if key in owners:
+            if owners[key] < rank:
+                return
+            # Drop the edges (and the orphans) of the later product
+            children = list(Gd.successors(key))
+            Gd.remove_edges_from([(key, c) for c in children])
+            Gd.remove_nodes_from(
+                c
+                for c in children
+                if Gd.degree(c) == 0 and "attr" not in Gd.nodes[c]
+            )
+        owners[key] = rank
+        self._add_product(Gd, p)
+
     @classmethod
-    def get_reach_subgraphs(cls, Gd: nx.DiGraph) -> Dict[str, nx.DiGraph]:
+    def get_reach_subgraphs(cls, Gd: nx.DiGraph) -> ComponentIndex:
         """
         Get a list of reachable subgraph from source nodes.
 
         Find all nodes with indegree==0 (heads) and find subgraph of reachable
-        nodes.
+        nodes. Subgraphs are views of Gd (see ComponentIndex).
         """
-        # Get list of heads
-        heads = [n for n, indeg in Gd.in_degree() if indeg == 0]
-
-        for h in Gd.nodes:
-            if h in heads:
-                Gd.nodes[h]["is_head"] = True
-            else:
-                Gd.nodes[h]["is_head"] = False
-
-        # Extract subgraphs reachable from each head node.
-        def extract_subgraph(graph, start_node):
-            """Use BFS to find all nodes reachable from start_node."""
-            reachable_nodes = set(nx.bfs_tree(graph, start_node))
-            return graph.subgraph(reachable_nodes).copy()
-
-        # Store the subgraphs in a list
-        subgraphs = {
-            node: extract_subgraph(Gd, node)
-            for node in Gd
-            if Gd.nodes[node]["is_head"]
-        }
-        return subgraphs
+        components = ComponentIndex.from_graph(Gd)
+        for n in Gd.nodes:
+            Gd.nodes[n]["is_head"] = n in components
+        return components
 
     # Exporting
     def export(self):
@@ -255,7 +368,7 @@ class SynthTree(ResearchDoc):
         final_json = [{"smiles": "", "type": "reaction", "children": slist}]
         return final_json
 
-    def select_syntheses(self) -> None:
+    def select_syntheses(self) -> PageRange:
         """Select the part of the SI where syntheses are described."""
         si_split = SISplitter()
 
@@ -264,24 +377,16 @@ class SynthTree(ResearchDoc):
         if self.v:
             si_split.plot = True
 
-        doc = self.from_dir(self.doc_src)
-        relevant_si = si_split.select_relevant(doc)
-        relev_si_src = os.path.join(self.doc_src, "si_syntheses.pdf")
-        relevant_si.save(relev_si_src)
+        return si_split.select_relevant(self)
 
     async def async_extract_rss(
         self, mode: Literal["text", "vision"] = "text", si_select: bool = False
     ) -> list:
         """Extract reaction setups for each paragraph in the doc."""
-        if si_select:
-            self.select_syntheses()
-            relev_si_src = os.path.join(self.doc_src, "si_syntheses.pdf")
-        else:
-            relev_si_src = os.path.join(self.doc_src, "si_0.pdf")
-        self.paragraphs = await self._get_paragraphs(relev_si_src, mode=mode)
+        await self._load_paragraphs(mode, si_select)
 
-        raw_prodlist = await asyncio.gather(
-            *[p.async_extract(self.rxn_extract) for p in self.paragraphs]
+        raw_prodlist = await self.scheduler.run(
+            self.paragraphs, self.rxn_extract
         )
         self.raw_prods = list(chain(*raw_prodlist))  # type: ignore
 
@@ -290,6 +395,117 @@ class SynthTree(ResearchDoc):
         products = [p for p in self.raw_prods if not p.isempty()]
         return products
 
+    @classmethod
+    async def batch_extract_rss(
+        cls,
+        trees: List["SynthTree"],
+        mode: Literal["text", "vision"] = "text",
+        si_select: bool = False,
+        **kwargs,
+    ) -> List[List[Product]]:
+        """Extract the paragraphs of several papers in one batch job.
+
+        The paragraphs of all trees are sent together, with the extractor
+        of the first tree (see ExtractReaction.batch_extract). Sets
+        raw_prods of each tree; returns the non-empty products of each.
+        """
+        paragraphs = {}
+        for t, tree in enumerate(trees):
+            await tree._load_paragraphs(mode, si_select)
+            for i, prgr in enumerate(tree.paragraphs):
+                paragraphs[f"{t}-{i}"] = prgr.text
+
+        # The job is polled until done; keep the event loop free meanwhile
+        results = await asyncio.to_thread(
+            trees[0].rxn_extract.batch_extract,  # type: ignore
+            paragraphs,
+            **kwargs,
+        )
+
+        products = []
+        for t, tree in enumerate(trees):
+            tree.raw_prods = list(
+                chain.from_iterable(
+                    results[f"{t}-{i}"] for i in range(len(tree.paragraphs))
+                )
+            )
+            tree._log_products()
+            tree._report_process(tree.raw_prods)
+            products.append([p for p in tree.raw_prods if not p.isempty()])
+        return products
+
+    async def async_stream_rss(
+        self, mode: Literal["text", "vision"] = "text", si_select: bool = False
+    ) -> AsyncIterator[List[Product]]:
+        """Yield the products of each paragraph as soon as it is extracted."""
+        await self._load_paragraphs(mode, si_select)
+
+        async for _, prods in self.scheduler.stream(
+            self.paragraphs, self.rxn_extract
+        ):
+            yield prods
+
+    async def stream_graph(
+        self, si_select: bool = False
+    ) -> AsyncIterator[List[Product]]:
+        """Extract products and build full_g while the SI is being parsed.
+
+        Pages are parsed one at a time, each paragraph is sent to extraction
+        as soon as the next bold header closes it, and its products are
+        added to full_g as soon as they arrive. Yields the products of each
+        paragraph once full_g includes them. Text mode only.
+
+        Head flags and reach_subgraphs are set once the stream ends, as
+        partition() would set them.
+        """
+        relev_si = self._si_range(si_select)
+        self.paragraphs = []
+        self.full_g = nx.DiGraph()
+        results: Dict[int, List[Product]] = {}
+        owners: Dict[Optional[str], tuple] = {}
+
+        async for i, prods in self.scheduler.stream(
+            self._stream_paragraphs(relev_si), self.rxn_extract
+        ):
+            results[i] = prods
+            for j, p in enumerate(prods):
+                self._merge_product(self.full_g, p, (i, j), owners)
+            yield prods
+
+        self.raw_prods = list(chain(*(results[i] for i in sorted(results))))
+        self.products = [p for p in self.raw_prods if not p.isempty()]
+        self.reach_subgraphs = self.update_reach_subgraphs()
+        self._log_products()
+        self._report_process(self.raw_prods)
+
+    async def _stream_paragraphs(
+        self, doc_src: PageRange
+    ) -> AsyncIterator[SynthParagraph]:
+        """Yield the paragraphs of a page range while its pages are parsed."""
+        doc = doc_src.pages
+        pages = self._iter_pars_per_page(
+            doc, doc_src.start, doc_src.end, release=True
+        )
+        for par in self._iter_clean_pars(chain.from_iterable(pages)):
+            self.paragraphs.append(par)
+            yield par
+            # Let dispatched extractions progress between paragraphs
+            await asyncio.sleep(0)
+        doc.persist()
+
+    async def _load_paragraphs(
+        self, mode: Literal["text", "vision"], si_select: bool
+    ) -> None:
+        """Set self.paragraphs from the (relevant part of the) SI."""
+        relev_si = self._si_range(si_select)
+        self.paragraphs = await self._get_paragraphs(relev_si, mode=mode)
+
+    def _si_range(self, si_select: bool) -> PageRange:
+        """Pages of si_0.pdf, or of the SI's syntheses with si_select."""
+        if si_select:
+            return self.select_syntheses()
+        return self._range_of(os.path.join(self.doc_src, "si_0.pdf"))
+
     def _log_products(self) -> None:
         """Log the products extracted from the paragraphs."""
 
@@ -337,7 +553,7 @@ class SynthTree(ResearchDoc):
 
     async def _get_paragraphs(
         self,
-        doc_src: str,
+        doc_src: Union[str, PageRange],
         mode: Literal["text", "vision"] = "text",
         api_key: Optional[str] = None,
     ) -> List[SynthParagraph]:
@@ -345,82 +561,131 @@ class SynthTree(ResearchDoc):
         Create list of paragraphs from document.
 
         Input
-            doc_src: address of the pdf document.
+            doc_src: address of the pdf document, or a range of its pages.
         """
+        if isinstance(doc_src, str):
+            doc_src = self._range_of(doc_src)
         if mode == "text":
-            fitz_si_syn = fitz.open(doc_src)
-            end = fitz_si_syn.page_count
-
-            parags_pages = self._get_pars_per_page(fitz_si_syn, 0, end)
+            pages = doc_src.pages
+            parags_pages = self._get_pars_per_page(
+                pages, doc_src.start, doc_src.end
+            )
+            pages.persist()
             return self._clean_up_pars(parags_pages)
         if mode == "vision":
-            parser = VisionParser(ptype="vision", api_key=api_key)
+            parser = VisionParser(
+                ptype="vision",
+                api_key=api_key,
+                workers=self.page_workers,
+                render_cache=RenderCache() if self.parse_cache else None,
+            )
             return await parser.vision_parse(
                 doc_src, batch_size=5, model="gpt-4o", prgr_sep="##---##"
             )
 
+    def _range_of(self, doc_src: str) -> PageRange:
+        """Pages of a pdf, taken from the SI page cache if it is an SI file."""
+        if self.si_pages is not None:
+            span = self.si_pages.file_range(doc_src)
+            if span is not None:
+                return PageRange(self.si_pages, *span)
+        return PageRange(DocPages.open([doc_src], cache=self.parse_cache))
+
     def _clean_up_pars(self, pars):
         """Merge and filter out paragraphs."""
-        all_paragraphs = []
+        return list(self._iter_clean_pars(pars))
+
+    def _iter_clean_pars(self, pars):
+        """Merge and filter out paragraphs, lazily.
+
+        A paragraph is yielded as soon as the next bold header closes it.
+        """
         new_paragraph = ""
 
         for par in pars:
             if par[0] == "bold":
                 if new_paragraph != "" and not new_paragraph.isspace():
-                    all_paragraphs.append(SynthParagraph(new_paragraph))
+                    yield SynthParagraph(new_paragraph)
                 new_paragraph = ""
             new_paragraph += par[1]
 
-        return all_paragraphs
+    def _get_pars_per_page(self, doc, start, end, workers=None):
+        """Get all paragraphs in this page."""
+        pages = self._iter_pars_per_page(doc, start, end, workers)
+        return list(chain.from_iterable(pages))
 
-    def _get_pars_per_page(self, doc, start, end):
-        """Get all paragraphs in this page.
+    def _iter_pars_per_page(
+        self, doc, start, end, workers=None, release=False
+    ):
+        """Yield the paragraphs of each page, one page at a time.
 
-        This is one of these functions you simply don't touch.
+        doc is a fitz document or its DocPages cache. With workers > 1,
+        pages are extracted in a process pool first (see
+        DocPages.extract_all); they are still yielded in order. With
+        release, the blocks of each page are dropped once it is yielded,
+        and pages are extracted here one by one, so memory stays flat.
         """
-        all_paragraphs = []
-
-        # iterate over pages of document
+        pages = doc if isinstance(doc, DocPages) else DocPages(doc)
+        workers = workers or self.page_workers
+        if workers > 1 and not release:
+            pages.extract_all(workers, start, end)
         for i in range(start, end):
-            # make a dictionary
-            json_data = doc[i].get_text("json")
-            json_page = json.loads(json_data)
-            page_blocks = json_page["blocks"]
-
-            page_paragraphs = []
-            new_paragraph = ""
-            bold_txt = ""
-            start_bold = False
-
-            for j in range(len(page_blocks)):
-                line = page_blocks[j]
-
-                if "lines" in list(line.keys()):
-                    for n in line["lines"]:
-                        text_boxes = n["spans"]
-
-                        for k in range(len(text_boxes)):
-                            font = text_boxes[k]["font"]
-                            text = text_boxes[k]["text"].replace("\n", "")
-                            # to check if it is a superscript
-                            flags = int(text_boxes[k]["flags"])
-
-                            if (
-                                not re.search(r"S\d+", text)
-                                or (
-                                    re.search(r"S\d+", text)
-                                    and ("Bold" in font or "bold" in font)
+            yield pages.paragraphs(i, _page_paragraphs)
+            if release:
+                pages.release(i)
+
+
+def _page_paragraphs(page_blocks: List[dict]) -> List[list]:
+    """Split the text blocks of a page into ["bold"|"plain", text] parts.
+
+    This is one of these functions you simply don't touch.
+    """
+    page_paragraphs = []
+    new_paragraph = ""
+    bold_txt = ""
+    start_bold = False
+
+    for j in range(len(page_blocks)):
+        line = page_blocks[j]
+
+        if "lines" in list(line.keys()):
+            for n in line["lines"]:
+                text_boxes = n["spans"]
+
+                for k in range(len(text_boxes)):
+                    font = text_boxes[k]["font"]
+                    text = text_boxes[k]["text"].replace("\n", "")
+                    # to check if it is a superscript
+                    flags = int(text_boxes[k]["flags"])
+
+                    if (
+                        not re.search(r"S\d+", text)
+                        or (
+                            re.search(r"S\d+", text)
+                            and ("Bold" in font or "bold" in font)
+                        )
+                        or re.search("[T|t]able", text)
+                        or re.search("[F|f]igure", text)
+                    ):
+                        if flags & 2**0:
+                            text = " " + text
+
+                        if k == (len(text_boxes) - 1) and j == (
+                            len(page_blocks) - 1
+                        ):
+                            new_paragraph += text
+                            if start_bold:
+                                page_paragraphs.append(["bold", new_paragraph])
+                            else:
+                                page_paragraphs.append(
+                                    ["plain", new_paragraph]
                                 )
-                                or re.search("[T|t]able", text)
-                                or re.search("[F|f]igure", text)
-                            ):
-                                if flags & 2**0:
-                                    text = " " + text
-
-                                if k == (len(text_boxes) - 1) and j == (
-                                    len(page_blocks) - 1
-                                ):
-                                    new_paragraph += text
+                            new_paragraph = ""
+                        else:
+                            if "Bold" in font or "bold" in font:
+                                bold_txt += text
+                            else:
+                                if len(bold_txt) > 5:
                                     if start_bold:
                                         page_paragraphs.append(
                                             ["bold", new_paragraph]
@@ -429,34 +694,18 @@ class SynthTree(ResearchDoc):
                                         page_paragraphs.append(
                                             ["plain", new_paragraph]
                                         )
+
+                                    start_bold = True
                                     new_paragraph = ""
+                                    new_paragraph += bold_txt
+                                    bold_txt = ""
                                 else:
-                                    if "Bold" in font or "bold" in font:
-                                        bold_txt += text
-                                    else:
-                                        if len(bold_txt) > 5:
-                                            if start_bold:
-                                                page_paragraphs.append(
-                                                    ["bold", new_paragraph]
-                                                )
-                                            else:
-                                                page_paragraphs.append(
-                                                    ["plain", new_paragraph]
-                                                )
-
-                                            start_bold = True
-                                            new_paragraph = ""
-                                            new_paragraph += bold_txt
-                                            bold_txt = ""
-                                        else:
-                                            new_paragraph += bold_txt
-                                            bold_txt = ""
-
-                                        if new_paragraph == "":
-                                            start_bold = False
-
-                                        new_paragraph += text
-
-            all_paragraphs.extend(page_paragraphs)
-
-        return all_paragraphs
+                                    new_paragraph += bold_txt
+                                    bold_txt = ""
+
+                                if new_paragraph == "":
+                                    start_bold = False
+
+                                new_paragraph += text
+
+    return page_paragraphs
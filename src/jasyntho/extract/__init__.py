@@ -1,4 +1,8 @@
 """Given a text segment and text class, extract relevant data into JSON format"""
 
+from .batch import BatchJob  # noqa
+from .cache import LLMCache  # noqa
+from .clients import ClientRegistry, clients  # noqa
+from .scheduler import ExtractionScheduler  # noqa
 from .single_reaction import ExtractReaction  # noqa
 from .substances import *  # noqa
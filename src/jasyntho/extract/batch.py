@@ -0,0 +1,178 @@
+"""Offline paragraph extraction through the OpenAI Batch API."""
+
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from instructor import openai_schema  # type: ignore
+from pydantic import ValidationError
+
+from .cache import LLMCache
+from .clients import clients
+from .substances import Product
+from .substances.llm_config import config
+from .substances.substance import SubstanceInReactionList
+
+_DONE = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchJob:
+    """Extract many paragraphs in one provider batch job.
+
+    Requests are the same as those of Product.from_paragraph (the response
+    schema is sent as a forced tool call), written to a JSONL file with the
+    paragraph ids as custom ids. The job is submitted, polled until done,
+    and its results are mapped back to the paragraphs. Batch jobs trade
+    latency (up to completion_window) for a separate, much larger rate
+    limit and a lower price.
+
+    client: OpenAI client (defaults to the shared one).
+    cache: optional LLMCache; cached paragraphs are not sent, and results
+        are stored in it.
+    poll_interval: seconds between status checks.
+    """
+
+    def __init__(
+        self,
+        llm: str,
+        client: Any = None,
+        cache: Optional[LLMCache] = None,
+        bypass_cache: bool = False,
+        poll_interval: float = 30.0,
+        completion_window: str = "24h",
+    ):
+        self.llm = llm
+        self.client = client or clients.get("openai")
+        self.cache = cache
+        self.bypass_cache = bypass_cache
+        self.poll_interval = poll_interval
+        self.completion_window = completion_window
+        self._schema = openai_schema(SubstanceInReactionList).openai_schema
+
+    def request(self, custom_id: str, text: str) -> dict:
+        """Batch input line for one paragraph."""
+        return {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": self.llm,
+                "messages": [{"role": "user", "content": text}],
+                "max_tokens": config.max_tokens,
+                "temperature": config.temperature,
+                "tools": [{"type": "function", "function": self._schema}],
+                "tool_choice": {
+                    "type": "function",
+                    "function": {"name": self._schema["name"]},
+                },
+            },
+        }
+
+    def write(self, paragraphs: Dict[str, str], path: str) -> int:
+        """Write the requests of paragraphs (id -> text) to a JSONL file.
+
+        Returns the number of requests written.
+        """
+        with open(path, "w") as f:
+            for pid, text in paragraphs.items():
+                f.write(json.dumps(self.request(pid, text)) + "\n")
+        return len(paragraphs)
+
+    def submit(self, path: str) -> str:
+        """Upload a request file and start a batch job. Returns its id."""
+        with open(path, "rb") as f:
+            upload = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=upload.id,
+            endpoint="/v1/chat/completions",
+            completion_window=self.completion_window,
+        )
+        return batch.id
+
+    def wait(self, batch_id: str, timeout: Optional[float] = None):
+        """Poll a batch job until it is done. Returns the batch."""
+        start = time.monotonic()
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            if batch.status in _DONE:
+                return batch
+            if timeout is not None and time.monotonic() - start > timeout:
+                raise TimeoutError(f"Batch {batch_id} is {batch.status}.")
+            time.sleep(self.poll_interval)
+
+    def results(
+        self, batch, paragraphs: Dict[str, str]
+    ) -> Dict[str, List[Product]]:
+        """Products of each paragraph of a finished batch job.
+
+        Paragraphs without a valid response get an empty product.
+        """
+        responses: Dict[str, dict] = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id is None:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if line.strip():
+                    item = json.loads(line)
+                    responses[item["custom_id"]] = item
+
+        prods = {}
+        for pid, text in paragraphs.items():
+            prds = self._products(responses.get(pid), text)
+            for p in prds:
+                p.text = text
+            prods[pid] = prds
+        return prods
+
+    def run(
+        self, paragraphs: Dict[str, str], timeout: Optional[float] = None
+    ) -> Dict[str, List[Product]]:
+        """Extract paragraphs (id -> text) in a batch job.
+
+        Paragraphs found in the cache are not sent.
+        """
+        prods: Dict[str, List[Product]] = {}
+        todo = {}
+        for pid, text in paragraphs.items():
+            _, subs_list = Product._cache_lookup(
+                text, self.llm, self.cache, self.bypass_cache
+            )
+            if subs_list is None:
+                todo[pid] = text
+                continue
+            prods[pid] = Product.from_substancelist(subs_list)
+            for p in prods[pid]:
+                p.text = text
+
+        if todo:
+            fd, path = tempfile.mkstemp(suffix=".jsonl")
+            os.close(fd)
+            try:
+                self.write(todo, path)
+                batch = self.wait(self.submit(path), timeout)
+            finally:
+                os.remove(path)
+            prods.update(self.results(batch, todo))
+        return {pid: prods[pid] for pid in paragraphs}
+
+    def _products(self, item: Optional[dict], text: str) -> List[Product]:
+        """Parse one batch output line into products."""
+        if item is None:
+            return [Product.empty(note="Batch request failed.")]
+        response = item.get("response") or {}
+        if response.get("status_code") != 200:
+            error = item.get("error") or response.get("body", {}).get("error")
+            return [Product.empty(note=f"Batch request failed: {error}")]
+        try:
+            message = response["body"]["choices"][0]["message"]
+            args = message["tool_calls"][0]["function"]["arguments"]
+            subs_list = SubstanceInReactionList.model_validate_json(args)
+        except (KeyError, IndexError, TypeError, ValidationError):
+            return [Product.empty(note="Validation error.")]
+
+        if self.cache is not None:
+            key, _ = Product._cache_lookup(text, self.llm, self.cache, True)
+            self.cache.set(key, subs_list)
+        return Product.from_substancelist(subs_list)
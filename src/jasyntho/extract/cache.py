@@ -0,0 +1,114 @@
+"""Persistent cache for LLM responses."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Type
+
+from pydantic import BaseModel
+
+
+class LLMCache:
+    """SQLite-backed cache of structured LLM responses.
+
+    Entries are keyed by a hash of everything that determines the response:
+    prompt text, model, response schema and sampling parameters. When the
+    stored responses exceed max_size_mb, least recently used entries are
+    evicted.
+    """
+
+    def __init__(
+        self,
+        path: str = os.path.join("~", ".cache", "jasyntho", "llm.sqlite"),
+        max_size_mb: float = 512,
+    ):
+        self.path = os.path.expanduser(path)
+        self.max_size = int(max_size_mb * 2**20)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT, size INTEGER, atime REAL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_atime ON responses(atime)"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def key(
+        text: str,
+        model: str,
+        response_model: Type[BaseModel],
+        temperature: float,
+        max_tokens: int,
+    ) -> str:
+        """Hash the inputs that determine an LLM response."""
+        payload = json.dumps(
+            {
+                "text": text,
+                "model": model,
+                "schema": response_model.model_json_schema(),
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str, response_model: Type[BaseModel]):
+        """Return the cached response for key, or None."""
+        row = self.conn.execute(
+            "SELECT value FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        self.conn.execute(
+            "UPDATE responses SET atime = ? WHERE key = ?", (time.time(), key)
+        )
+        self.conn.commit()
+        return response_model.model_validate_json(row[0])
+
+    def set(self, key: str, value: BaseModel):
+        """Store a response, evicting old entries if over size."""
+        data = value.model_dump_json()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+            (key, data, len(data), time.time()),
+        )
+        self._evict()
+        self.conn.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until under max_size."""
+        (total,) = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if total <= self.max_size:
+            return
+
+        freed = 0
+        stale = []
+        for key, size in self.conn.execute(
+            "SELECT key, size FROM responses ORDER BY atime"
+        ):
+            if total - freed <= self.max_size:
+                break
+            stale.append((key,))
+            freed += size
+        self.conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[
+            0
+        ]
+
+    def clear(self):
+        """Remove all entries."""
+        self.conn.execute("DELETE FROM responses")
+        self.conn.commit()
@@ -0,0 +1,203 @@
+"""Process-wide registry of LLM API clients and their connection pools."""
+
+import asyncio
+import threading
+from typing import Any, Callable, Dict, Literal, Optional
+
+import anthropic  # type: ignore
+import httpx
+import instructor  # type: ignore
+import openai
+import requests
+from requests.adapters import HTTPAdapter
+
+Provider = Literal["openai", "anthropic"]
+
+_SDKS = {
+    "openai": (
+        openai.OpenAI,
+        openai.AsyncOpenAI,
+        openai.DefaultHttpxClient,
+        openai.DefaultAsyncHttpxClient,
+    ),
+    "anthropic": (
+        anthropic.Anthropic,
+        anthropic.AsyncAnthropic,
+        anthropic.DefaultHttpxClient,
+        anthropic.DefaultAsyncHttpxClient,
+    ),
+}
+
+
+class ClientRegistry:
+    """Share API clients, and their keep-alive connections, in a process.
+
+    Clients are keyed by provider, base URL and API key, so repeated
+    extractions reuse open TLS connections instead of handshaking again.
+    All clients of a provider (plain or patched with instructor) share one
+    HTTP connection pool per event loop: async connections belong to the
+    loop that opened them, so each loop gets its own pool.
+
+    max_connections, max_keepalive_connections, keepalive_expiry: limits of
+        each connection pool (see httpx.Limits).
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+    ):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self._clients: Dict[tuple, Any] = {}
+        self._pools: Dict[tuple, Any] = {}
+        self._sessions: Dict[Optional[str], requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, **limits):
+        """Change the pool limits. Clients created earlier are dropped."""
+        for name, value in limits.items():
+            if not hasattr(self, name) or name.startswith("_"):
+                raise ValueError(f"Unknown limit {name}.")
+            setattr(self, name, value)
+        self.clear()
+
+    def limits(self) -> httpx.Limits:
+        """Connection limits of the pools."""
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def get(
+        self,
+        provider: Provider,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        is_async: bool = False,
+    ):
+        """Shared SDK client (OpenAI, AsyncAnthropic...) of a provider."""
+        return self._client(
+            (provider, base_url, api_key, is_async, None),
+            lambda: self._sdk_client(provider, base_url, api_key, is_async),
+        )
+
+    def instructor(
+        self,
+        provider: Provider,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        is_async: bool = False,
+        mode: Optional[instructor.Mode] = None,
+    ):
+        """Shared client of a provider patched with instructor.
+
+        Without mode, the instructor default of the provider is used.
+        """
+
+        def make():
+            client = self._sdk_client(provider, base_url, api_key, is_async)
+            kwargs = {} if mode is None else {"mode": mode}
+            if provider == "anthropic":
+                return instructor.from_anthropic(client, **kwargs)
+            if mode is None:
+                patch = instructor.apatch if is_async else instructor.patch
+                return patch(client)
+            return instructor.from_openai(client, **kwargs)
+
+        return self._client(
+            (provider, base_url, api_key, is_async, mode), make
+        )
+
+    def session(self, base_url: Optional[str] = None) -> requests.Session:
+        """Shared requests session, for APIs called without an SDK."""
+        with self._lock:
+            if base_url not in self._sessions:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=self.max_keepalive_connections,
+                    pool_maxsize=self.max_connections,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[base_url] = session
+            return self._sessions[base_url]
+
+    def clear(self):
+        """Drop all clients; their connections close once unused."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._clients.clear()
+            self._pools.clear()
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def _client(self, key: tuple, make: Callable[[], Any]):
+        """Client cached under key; async ones are resolved per loop."""
+        if key[3]:
+            return _PerLoop(lambda loop: self._cached(key + (loop,), make))
+        return self._cached(key, make)
+
+    def _cached(self, key: tuple, make: Callable[[], Any]):
+        with self._lock:
+            if key not in self._clients:
+                self._clients[key] = make()
+            return self._clients[key]
+
+    def _sdk_client(
+        self,
+        provider: Provider,
+        base_url: Optional[str],
+        api_key: Optional[str],
+        is_async: bool,
+    ):
+        """New SDK client on the shared connection pool of provider."""
+        if provider not in _SDKS:
+            raise ValueError(f"Provider {provider} not recognized.")
+        sync_cls, async_cls, sync_http, async_http = _SDKS[provider]
+        loop = _running_loop() if is_async else None
+        pool_key = (provider, is_async, loop)
+        if pool_key not in self._pools:
+            http_cls = async_http if is_async else sync_http
+            self._pools[pool_key] = http_cls(limits=self.limits())
+            self._prune()
+        cls = async_cls if is_async else sync_cls
+        return cls(
+            base_url=base_url,
+            api_key=api_key,
+            http_client=self._pools[pool_key],
+        )
+
+    def _prune(self):
+        """Forget the clients of closed event loops."""
+        for d in (self._clients, self._pools):
+            for key in [k for k in d if _closed(k[-1])]:
+                del d[key]
+
+
+class _PerLoop:
+    """Proxy to the client of the running event loop."""
+
+    def __init__(self, resolve: Callable[[Any], Any]):
+        self._resolve = resolve
+
+    def __getattr__(self, name: str):
+        return getattr(self._resolve(_running_loop()), name)
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _closed(loop: Any) -> bool:
+    return isinstance(loop, asyncio.AbstractEventLoop) and loop.is_closed()
+
+
+clients = ClientRegistry()
@@ -0,0 +1,189 @@
+"""Bounded-concurrency scheduling of paragraph extraction requests."""
+
+import asyncio
+import random
+import time
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .substances import Product
+from .substances.llm_config import config
+
+
+class ExtractionScheduler:
+    """Run paragraph extractions concurrently without tripping rate limits.
+
+    max_in_flight: maximum number of requests awaiting a response.
+    tokens_per_minute: token budget of the provider. Requests are paced so
+        that their estimated tokens (prompt + max_tokens) stay within it.
+        None disables pacing.
+    max_retries: retries of a request answered with HTTP 429.
+    base_delay, max_delay: bounds (in seconds) of the exponential backoff
+        after a 429, unless the response has a retry-after header.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 16,
+        tokens_per_minute: Optional[int] = None,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ):
+        self.max_in_flight = max_in_flight
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    async def stream(
+        self, paragraphs: Union[Iterable, AsyncIterable], extractor
+    ) -> AsyncIterator[Tuple[int, List[Product]]]:
+        """Yield (index, products) for each paragraph as it completes.
+
+        paragraphs may be an (async) iterator: paragraphs are pulled from it
+        only when a request slot is free, so a lazy source is consumed at
+        the pace of extraction.
+        """
+        sem = asyncio.Semaphore(self.max_in_flight)
+        bucket = _TokenBucket(self.tokens_per_minute)
+        done: asyncio.Queue = asyncio.Queue()
+        tasks = set()
+        self._resume_at = 0.0
+
+        async def run(i, prgr):
+            try:
+                prods = await self._extract(prgr, extractor, bucket)
+                done.put_nowait((i, prods, None))
+            except Exception as e:
+                done.put_nowait((i, None, e))
+            finally:
+                sem.release()
+
+        async def produce():
+            n = 0
+            try:
+                async for prgr in _aiter(paragraphs):
+                    await sem.acquire()
+                    tasks.add(asyncio.ensure_future(run(n, prgr)))
+                    n += 1
+            except Exception as e:
+                done.put_nowait((None, None, e))
+            # Total count, so the consumer knows when to stop
+            done.put_nowait((n, None, None))
+
+        producer = asyncio.ensure_future(produce())
+        total, nyielded = None, 0
+        try:
+            while total is None or nyielded < total:
+                i, prods, error = await done.get()
+                if error is not None:
+                    raise error
+                if prods is None:
+                    total = i
+                    continue
+                nyielded += 1
+                yield i, prods
+        finally:
+            producer.cancel()
+            for t in tasks:
+                t.cancel()
+
+    async def run(
+        self, paragraphs: Union[Iterable, AsyncIterable], extractor
+    ) -> List[List[Product]]:
+        """Extract all paragraphs. Results are in the order of paragraphs."""
+        results: Dict[int, List[Product]] = {}
+        async for i, prods in self.stream(paragraphs, extractor):
+            results[i] = prods
+        return [results[i] for i in range(len(results))]
+
+    async def _extract(self, prgr, extractor, bucket) -> List[Product]:
+        """Extract one paragraph, backing off while rate limited."""
+        tokens = len(prgr.text) // 4 + config.max_tokens
+        for attempt in range(self.max_retries + 1):
+            # A 429 anywhere pauses every request, not only the failed one
+            await asyncio.sleep(max(0.0, self._resume_at - time.monotonic()))
+            await bucket.acquire(tokens)
+            try:
+                return await prgr.async_extract(extractor)
+            except Exception as e:
+                if not _is_rate_limit(e):
+                    raise
+                if attempt == self.max_retries:
+                    break
+                delay = self._backoff(e, attempt)
+                self._resume_at = max(
+                    self._resume_at, time.monotonic() + delay
+                )
+
+        prd = Product.empty(note="Rate limit exceeded.")
+        prd.text = prgr.text
+        return [prd]
+
+    def _backoff(self, e: Exception, attempt: int) -> float:
+        """Seconds to wait after a 429: retry-after, or exponential."""
+        response = getattr(e, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        try:
+            return float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            delay = min(self.max_delay, self.base_delay * 2**attempt)
+            return delay * random.uniform(0.5, 1.0)
+
+
+class _TokenBucket:
+    """Token bucket refilled continuously at tokens_per_minute."""
+
+    def __init__(self, tokens_per_minute: Optional[int]):
+        self.capacity = tokens_per_minute
+        self.tokens = float(tokens_per_minute or 0)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self, n: int):
+        """Wait until n tokens are available and take them."""
+        if self.capacity is None:
+            return
+        n = min(n, self.capacity)
+        rate = self.capacity / 60
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * rate
+                )
+                self.updated = now
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return
+                await asyncio.sleep((n - self.tokens) / rate)
+
+
+async def _aiter(items: Union[Iterable, AsyncIterable]) -> AsyncIterator:
+    """Iterate over a sync or async iterable asynchronously."""
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+def _is_rate_limit(e: BaseException) -> bool:
+    """Tell if e (or an exception it wraps) is an HTTP 429."""
+    seen = set()
+    while e is not None and id(e) not in seen:
+        seen.add(id(e))
+        if getattr(e, "status_code", None) == 429:
+            return True
+        e = e.__cause__ or e.__context__
+    return False
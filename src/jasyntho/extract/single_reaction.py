@@ -1,34 +1,70 @@
 """Data extractors for segments of chemical synthesis paragraphs."""
 
 import os
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional
 
 import instructor  # type: ignore
-from anthropic import Anthropic, AsyncAnthropic  # type: ignore
 from dotenv import load_dotenv
-from openai import AsyncOpenAI, OpenAI  # type: ignore
 from pydantic import BaseModel, model_validator
 
+from .batch import BatchJob
+from .cache import LLMCache
+from .clients import clients
 from .substances import Product
 
 
 class ExtractReaction(BaseModel):
+    """Extract the substances of a reaction paragraph with an LLM.
+
+    cache: optional persistent cache of LLM responses. Paragraphs already
+        extracted with the same model and settings skip the LLM call.
+    bypass_cache: skip cache lookups but still store fresh responses.
+    """
+
     llm: str = "gpt-4-0613"
     client: Optional[Any] = None
     aclient: Optional[Any] = None
+    cache: Optional[LLMCache] = None
+    bypass_cache: bool = False
+
+    class Config:
+        """Pydantic config."""
+
+        arbitrary_types_allowed = True
 
     def __call__(self, text: str) -> List[Product]:
         """Execute the extraction pipeline for a single paragraph."""
-        product = Product.from_paragraph(text, self.client, self.llm)
+        product = Product.from_paragraph(
+            text, self.client, self.llm, self.cache, self.bypass_cache
+        )
         return product
 
     async def async_call(self, text: str) -> List[Product]:
         """Execute the extraction pipeline for a paragraph asynchronously."""
         product = await Product.async_from_paragraph(
-            text, self.aclient, self.llm
+            text, self.aclient, self.llm, self.cache, self.bypass_cache
         )
         return product
 
+    def batch_extract(
+        self, paragraphs: Dict[str, str], **kwargs
+    ) -> Dict[str, List[Product]]:
+        """Extract many paragraphs (id -> text) offline, in a batch job.
+
+        For throughput-bound runs where latency does not matter. kwargs
+        are passed to BatchJob (poll_interval, completion_window...).
+        """
+        if not self.llm.startswith("gpt"):
+            raise ValueError(f"Batch jobs are not supported for {self.llm}.")
+        job = BatchJob(
+            self.llm,
+            client=clients.get("openai"),
+            cache=self.cache,
+            bypass_cache=self.bypass_cache,
+            **kwargs,
+        )
+        return job.run(paragraphs)
+
     @model_validator(mode="after")
     def init_llm_synthex(self):
         """Set the llm and synthesis extractor."""
@@ -37,37 +73,33 @@ class ExtractReaction(BaseModel):
         return self
 
     def set_llm(self, model: str):
-        """Set the language model to be used."""
+        """Set the language model to be used.
+
+        Clients come from the process-wide registry, so extractors of the
+        same provider share their HTTP connections.
+        """
 
         load_dotenv()
         if model.startswith("gpt"):
-            self.client = instructor.patch(OpenAI())
-            self.aclient = instructor.apatch(AsyncOpenAI())
+            self.client = clients.instructor("openai")
+            self.aclient = clients.instructor("openai", is_async=True)
 
         elif model.startswith("mistral") or ("mixtral" in model):
             url = "https://api.mistral.ai/v1/"
             api_key = os.getenv("MISTRAL_API_KEY")
 
-            self.client = instructor.from_openai(
-                OpenAI(base_url=url, api_key=api_key),
-                mode=instructor.Mode.JSON,
+            self.client = clients.instructor(
+                "openai", url, api_key, mode=instructor.Mode.JSON
             )
-            self.aclient = instructor.from_openai(
-                AsyncOpenAI(base_url=url, api_key=api_key),
-                mode=instructor.Mode.JSON,
+            self.aclient = clients.instructor(
+                "openai", url, api_key, True, mode=instructor.Mode.JSON
             )
 
         elif model.startswith("claude"):
-
-            self.client = instructor.from_anthropic(
-                Anthropic(
-                    api_key=os.getenv("ANTHROPIC_API_KEY"),
-                ),
-            )
-            self.aclient = instructor.from_anthropic(
-                AsyncAnthropic(
-                    api_key=os.getenv("ANTHROPIC_API_KEY"),
-                ),
+            api_key = os.getenv("ANTHROPIC_API_KEY")
+            self.client = clients.instructor("anthropic", api_key=api_key)
+            self.aclient = clients.instructor(
+                "anthropic", api_key=api_key, is_async=True
             )
         else:
             raise ValueError(f"Model {model} not recognized.")
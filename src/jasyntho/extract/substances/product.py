@@ -9,6 +9,7 @@ from pydantic import ValidationError
 
 from .llm_config import config
 from .substance import SubstanceInReaction, SubstanceInReactionList
+from ..cache import LLMCache
 
 
 class Product(SubstanceInReaction):
@@ -117,20 +118,31 @@ class Product(SubstanceInReaction):
         )
 
     @classmethod
-    def from_paragraph(cls, prgr: str, client: instructor.patch, llm: str):
+    def from_paragraph(
+        cls,
+        prgr: str,
+        client: instructor.patch,
+        llm: str,
+        cache: Optional[LLMCache] = None,
+        bypass_cache: bool = False,
+    ):
         """Extract the substances in a reaction."""
+        key, subs_list = cls._cache_lookup(prgr, llm, cache, bypass_cache)
         try:
-            subs_list = client.chat.completions.create(
-                model=llm,
-                response_model=SubstanceInReactionList,
-                messages=[
-                    {"role": "user", "content": prgr},
-                ],
-                max_tokens=config.max_tokens,
-                temperature=config.temperature,
-                max_retries=config.max_retries,
-                timeout=config.timeout,
-            )
+            if subs_list is None:
+                subs_list = client.chat.completions.create(
+                    model=llm,
+                    response_model=SubstanceInReactionList,
+                    messages=[
+                        {"role": "user", "content": prgr},
+                    ],
+                    max_tokens=config.max_tokens,
+                    temperature=config.temperature,
+                    max_retries=config.max_retries,
+                    timeout=config.timeout,
+                )
+                if cache is not None:
+                    cache.set(key, subs_list)
             prd = cls.from_substancelist(subs_list)
         except (openai.APITimeoutError, ValidationError) as e:  # type: ignore
             if isinstance(e, openai.APITimeoutError):  # type: ignore
@@ -144,21 +156,30 @@ class Product(SubstanceInReaction):
 
     @classmethod
     async def async_from_paragraph(
-        cls, prgr: str, aclient: instructor.apatch, llm: str
+        cls,
+        prgr: str,
+        aclient: instructor.apatch,
+        llm: str,
+        cache: Optional[LLMCache] = None,
+        bypass_cache: bool = False,
     ):
         """Extract the substances in a reaction."""
+        key, subs_list = cls._cache_lookup(prgr, llm, cache, bypass_cache)
         try:
-            subs_list = await aclient.chat.completions.create(
-                model=llm,
-                response_model=SubstanceInReactionList,
-                messages=[
-                    {"role": "user", "content": prgr},
-                ],
-                max_tokens=config.max_tokens,
-                temperature=config.temperature,
-                max_retries=config.max_retries,
-                timeout=config.timeout,
-            )
+            if subs_list is None:
+                subs_list = await aclient.chat.completions.create(
+                    model=llm,
+                    response_model=SubstanceInReactionList,
+                    messages=[
+                        {"role": "user", "content": prgr},
+                    ],
+                    max_tokens=config.max_tokens,
+                    temperature=config.temperature,
+                    max_retries=config.max_retries,
+                    timeout=config.timeout,
+                )
+                if cache is not None:
+                    cache.set(key, subs_list)
             prd = cls.from_substancelist(subs_list)
         except (openai.APITimeoutError, ValidationError, instructor.exceptions.IncompleteOutputException) as e:  # type: ignore
             if isinstance(e, openai.APITimeoutError):  # type: ignore
@@ -170,6 +191,29 @@ class Product(SubstanceInReaction):
             p.text = prgr
         return prd
 
+    @staticmethod
+    def _cache_lookup(
+        prgr: str, llm: str, cache: Optional[LLMCache], bypass_cache: bool
+    ):
+        """Return the cache key and cached response (None on a miss).
+
+        With bypass_cache, the lookup is skipped but the key is still
+        returned, so the fresh response overwrites the cached one.
+        """
+        if cache is None:
+            return None, None
+
+        key = cache.key(
+            prgr,
+            llm,
+            SubstanceInReactionList,
+            config.temperature,
+            config.max_tokens,
+        )
+        if bypass_cache:
+            return key, None
+        return key, cache.get(key, SubstanceInReactionList)
+
     @classmethod
     def empty(cls, note):
         """Return an empty product."""
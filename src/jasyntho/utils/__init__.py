@@ -1,5 +1,10 @@
 """Various general tools for the project."""
 
-from .get_iupac import RetrieveName
+from .get_iupac import NameRetrieval, RetrieveName
 from .llms import set_llm
-from .translation import name_to_smiles
+from .translation import (
+    SMILES_MEMO,
+    SmilesResolver,
+    default_resolver,
+    name_to_smiles,
+)
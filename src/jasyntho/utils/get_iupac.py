@@ -1,13 +1,18 @@
 """Retrieve IUPAC names for substances."""
 
+import hashlib
+import json
 import re
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 import dspy
 import networkx as nx
 import requests
 from pydantic import BaseModel
 
+from jasyntho.extract.cache import LLMCache
+
 
 class Response(dspy.Signature):
     """Retrieve name of a substance."""
@@ -35,3 +40,82 @@ class RetrieveName(dspy.Module):
 
         name = self.name(context=context, substance=substance)
         return name
+
+
+class RetrievedNames(BaseModel):
+    """Names retrieved for a substance."""
+
+    names: List[str]
+
+
+class NameRetrieval:
+    """Retrieve the names of many substances concurrently.
+
+    Each query (substance, context) runs RetrieveName with the configured
+    dspy LM, with at most max_workers queries in flight. Results are kept
+    per (substance, context hash, model), in memory and, if given, in a
+    persistent LLMCache. Failed queries give no names and are not cached.
+    """
+
+    def __init__(self, max_workers: int = 8, cache: Optional[LLMCache] = None):
+        self.max_workers = max_workers
+        self.cache = cache
+        self._memo: Dict[str, List[str]] = {}
+
+    def __call__(self, queries: List[Tuple[str, str]]) -> List[List[str]]:
+        """Names of each (substance, context), in the order of queries."""
+        model = _lm_name()
+        keys = [self.key(subs, context, model) for subs, context in queries]
+
+        todo = {}
+        for key, query in zip(keys, queries):
+            if key in self._memo or key in todo:
+                continue
+            cached = (
+                self.cache.get(key, RetrievedNames) if self.cache else None
+            )
+            if cached is not None:
+                self._memo[key] = cached.names
+            else:
+                todo[key] = query
+
+        if todo:
+            with ThreadPoolExecutor(self.max_workers) as pool:
+                results = pool.map(lambda q: _retrieve(*q), todo.values())
+                for key, names in zip(todo, results):
+                    if names is None:
+                        continue
+                    self._memo[key] = names
+                    if self.cache is not None:
+                        self.cache.set(key, RetrievedNames(names=names))
+
+        return [self._memo.get(key, []) for key in keys]
+
+    @staticmethod
+    def key(substance: str, context: str, model: str) -> str:
+        """Cache key of a query."""
+        payload = json.dumps(
+            {
+                "task": "retrieve_name",
+                "substance": substance,
+                "context": hashlib.sha256(context.encode()).hexdigest(),
+                "model": model,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _retrieve(substance: str, context: str) -> Optional[List[str]]:
+    """Names of substance from RetrieveName, or None if the call failed."""
+    try:
+        return list(RetrieveName()(substance, context).name)
+    except Exception:
+        return None
+
+
+def _lm_name() -> str:
+    """Name of the configured dspy LM."""
+    lm = dspy.settings.lm
+    kwargs = getattr(lm, "kwargs", None) or {}
+    return str(kwargs.get("model") or getattr(lm, "model", None) or lm)
@@ -4,9 +4,10 @@ import json
 import os
 
 import dspy
-import requests
 from dsp.modules.databricks import custom_client_chat_request, custom_client_completions_request
 
+from jasyntho.extract.clients import clients
+
 
 class Mistral(dspy.Databricks):
     """Mistral API client."""
@@ -104,7 +105,8 @@ class Claude(dspy.Databricks):
             "messages": [{"role": "user", "content": prompt}],
         }
 
-        response = requests.post(self.base_url, headers=headers, json=data)
+        session = clients.session(self.base_url)
+        response = session.post(self.base_url, headers=headers, json=data)
         response = response.json()
 
         self.history.append(
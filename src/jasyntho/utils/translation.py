@@ -1,25 +1,167 @@
 """Translation utils between molecular representations."""
 
+import os
 import re
+import sqlite3
+import tempfile
+import threading
 import warnings
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from py2opsin import py2opsin
 
 warnings.filterwarnings("ignore", category=RuntimeWarning, module="py2opsin")
 
+# Persistent memo shared across papers and runs, for SmilesResolver
+SMILES_MEMO = "~/.cache/jasyntho/smiles.sqlite"
+
+
+class SmilesResolver:
+    """Resolve names into SMILES with OPSIN, many names at a time.
+
+    Each OPSIN call starts a JVM, so names are sent in chunks of up to
+    chunk_size per call, with up to workers calls running in parallel.
+    Results (including names OPSIN cannot parse) are memoized; with
+    memo_path, the memo is an SQLite file shared across papers and runs.
+    """
+
+    def __init__(
+        self,
+        memo_path: Optional[str] = None,
+        workers: int = 4,
+        chunk_size: int = 500,
+    ):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._memo: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+        self.conn = None
+        if memo_path is not None:
+            path = os.path.expanduser(memo_path)
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.conn = sqlite3.connect(
+                path, timeout=30, check_same_thread=False
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS smiles ("
+                "name TEXT PRIMARY KEY, smiles TEXT)"
+            )
+            self.conn.commit()
+
+    def __call__(self, name: str, subs_label: str) -> Optional[str]:
+        """Convert a name into SMILES (see name_to_smiles)."""
+        return self.resolve_labeled([(name, subs_label)])[0]
+
+    def resolve(self, names: Iterable[str]) -> Dict[str, Optional[str]]:
+        """SMILES of each name (None if OPSIN cannot parse it)."""
+        names = list(dict.fromkeys(names))
+        found = {n: self._memo[n] for n in names if n in self._memo}
+        todo = [n for n in names if n not in found]
+        found.update(self._memo_lookup(todo))
+        todo = [n for n in todo if n not in found]
+
+        chunks = [
+            todo[i : i + self.chunk_size]
+            for i in range(0, len(todo), self.chunk_size)
+        ]
+        if len(chunks) > 1 and self.workers > 1:
+            with ThreadPoolExecutor(self.workers) as pool:
+                results = list(pool.map(_opsin, chunks))
+        else:
+            results = [_opsin(c) for c in chunks]
+
+        new = {}
+        for chunk, smiles in zip(chunks, results):
+            if smiles is None:  # OPSIN failed; not memoized
+                found.update(dict.fromkeys(chunk))
+                continue
+            new.update(zip(chunk, smiles))
+        found.update(new)
+        self._memo_store(new)
+        return {n: found[n] for n in names}
+
+    def resolve_labeled(
+        self, pairs: List[Tuple[str, str]]
+    ) -> List[Optional[str]]:
+        """Resolve (name, substance label) pairs, as name_to_smiles does.
+
+        Names that fail and contain the label are retried without it, in
+        a second batch.
+        """
+        first = self.resolve(name for name, _ in pairs)
+        retry = {
+            i: _strip_label(name, label)
+            for i, (name, label) in enumerate(pairs)
+            if first[name] is None and label and label in name
+        }
+        second = self.resolve(retry.values())
+
+        return [
+            first[name] or (second[retry[i]] if i in retry else None)
+            for i, (name, _) in enumerate(pairs)
+        ]
+
+    def _memo_lookup(self, names: List[str]) -> Dict[str, Optional[str]]:
+        """Entries of the persistent memo, copied to the in-memory one."""
+        if self.conn is None or not names:
+            return {}
+        found = {}
+        with self._lock:
+            for i in range(0, len(names), 500):
+                chunk = names[i : i + 500]
+                rows = self.conn.execute(
+                    "SELECT name, smiles FROM smiles WHERE name IN "
+                    f"({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                found.update(rows)
+        self._memo.update(found)
+        return found
+
+    def _memo_store(self, results: Dict[str, Optional[str]]):
+        self._memo.update(results)
+        if self.conn is None or not results:
+            return
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO smiles VALUES (?, ?)",
+                results.items(),
+            )
+            self.conn.commit()
+
+
+def _opsin(names: List[str]) -> Optional[List[Optional[str]]]:
+    """Parse names in a single OPSIN call. None if the call failed."""
+    # One name per line: line breaks inside a name would shift the output
+    lines = [" ".join(n.split()) or "-" for n in names]
+    fd, tmp = tempfile.mkstemp(suffix=".txt")
+    os.close(fd)
+    try:
+        out = py2opsin(lines, tmp_fpath=tmp)
+    except Exception:
+        return None
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    if not isinstance(out, list) or len(out) != len(names):
+        return None
+    return [s or None for s in out]
+
+
+def _strip_label(name: str, subs_label: str) -> str:
+    """Remove the substance label, maybe in parentheses, from a name."""
+    return re.sub(f"\\(?{re.escape(subs_label)}\\)?", "", name)
+
+
+_resolver = SmilesResolver()
+
+
+def default_resolver() -> SmilesResolver:
+    """Resolver shared by name_to_smiles and every SynthTree by default."""
+    return _resolver
+
 
 def name_to_smiles(name: str, subs_label: str) -> Optional[str]:
     """Convert IUPAC name into SMILES."""
-    s = py2opsin(name)
-    if s:
-        return s
-
-    # Maybe substance label is in name. Remove if so
-    if subs_label in name:
-        regex = f"\(?{subs_label}\)?"
-        name = re.sub(regex, "", name)
-        s = py2opsin(name)
-        if s:
-            return s
-    return None
+    return _resolver(name, subs_label)
@@ -5,6 +5,7 @@ import networkx as nx
 import numpy as np
 
 from gosybench.basetypes import STree
+from gosybench.metrics import TreeMetrics
 from gosybench.metrics.utils import SmilesPathFinder
 
 
@@ -62,5 +63,18 @@ class TestMaxSeqSmiles(unittest.TestCase):
             self.assertIn(f"long_path_{i}_src", optimized_result)
 
 
+class TestGraphDescribe(unittest.TestCase):
+    """Test the graph_describe method in TreeMetrics."""
+
+    def test_nrgs_initial(self):
+        """Heads are counted as in earlier releases of the benchmark."""
+        graph = nx.DiGraph([("1", "2"), ("2", "3"), ("ab", "4")])
+        graph.add_nodes_from(["12", "xy"])
+        stree = STree(graph=graph, products=[])
+
+        gd = TreeMetrics().graph_describe(stree)
+        self.assertEqual(gd["nrgs_initial"], 3)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+
+import networkx as nx
+
+from gosybench.metrics.paths import PathIndex, PathIndexCache, reach_matrix
+
+
+def brute_force_paths(G):
+    """Reference enumeration of all simple paths between distinct nodes."""
+    paths = []
+    for n0 in G.nodes:
+        for n1 in G.nodes:
+            if n0 != n1 and nx.has_path(G, n0, n1):
+                paths += list(nx.all_simple_paths(G, source=n0, target=n1))
+    return paths
+
+
+class TestPathIndex(unittest.TestCase):
+    """Test the path enumeration engine."""
+
+    def test_dag_paths(self):
+        """DAG enumeration matches the pairwise enumeration."""
+        G = nx.gnp_random_graph(25, 0.2, seed=0, directed=True)
+        G = nx.DiGraph([(u, v) for u, v in G.edges if u < v])
+        self.assertTrue(nx.is_directed_acyclic_graph(G))
+        self.assertEqual(
+            sorted(PathIndex(G).paths), sorted(brute_force_paths(G))
+        )
+
+    def test_cyclic_paths(self):
+        """Cyclic graphs fall back to DFS, still matching all simple paths."""
+        G = nx.gnp_random_graph(10, 0.3, seed=1, directed=True)
+        self.assertFalse(nx.is_directed_acyclic_graph(G))
+        self.assertEqual(
+            sorted(PathIndex(G).paths), sorted(brute_force_paths(G))
+        )
+
+    def test_cache(self):
+        """Structurally equal graphs share one index."""
+        cache = PathIndexCache(maxsize=2)
+        g1 = nx.DiGraph([(0, 1), (1, 2)])
+        g2 = nx.DiGraph([(0, 1), (1, 2)])
+        g3 = nx.DiGraph([(0, 1)])
+        g4 = nx.DiGraph([(1, 0)])
+
+        self.assertIs(cache(g1), cache(g2))
+        self.assertIsNot(cache(g1), cache(g3))
+
+        # Oldest entry is evicted once maxsize is exceeded
+        index = cache(g1)
+        cache(g3)
+        cache(g4)
+        self.assertIsNot(cache(g1), index)
+
+
+class TestReachMatrix(unittest.TestCase):
+    """Test the transitive closure matrix."""
+
+    def test_matches_has_path(self):
+        """Closure agrees with nx.has_path, including cycles."""
+        G = nx.gnp_random_graph(15, 0.12, seed=2, directed=True)
+        index, reach = reach_matrix(G)
+        for a in G.nodes:
+            for b in G.nodes:
+                self.assertEqual(
+                    reach[index[a], index[b]], nx.has_path(G, a, b)
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
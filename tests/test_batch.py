@@ -0,0 +1,207 @@
+"""Test suite for batch-job paragraph extraction"""
+
+import asyncio
+import email
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import openai
+import pytest
+
+from jasyntho import SynthTree
+from jasyntho.extract import BatchJob, ExtractReaction, LLMCache, clients
+
+
+class FakeBatchAPI(BaseHTTPRequestHandler):
+    """Stand-in for the files and batches endpoints of the OpenAI API.
+
+    The "model" answers each paragraph with its first word as the main
+    product and the following words as reactants. Batches are reported
+    in progress on the first poll.
+    """
+
+    files: dict = {}
+    batches: dict = {}
+    requests: list = []
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, data, raw=False):
+        body = data.encode() if raw else json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["content-length"]))
+        if self.path == "/v1/files":
+            msg = email.message_from_bytes(
+                b"content-type: "
+                + self.headers["content-type"].encode()
+                + b"\r\n\r\n"
+                + body
+            )
+            part = next(
+                p
+                for p in msg.get_payload()
+                if p.get_param("name", header="content-disposition") == "file"
+            )
+            fid = f"file-{len(self.files)}"
+            self.files[fid] = part.get_payload(decode=True).decode()
+            self._send(
+                {
+                    "id": fid,
+                    "object": "file",
+                    "bytes": len(body),
+                    "created_at": 0,
+                    "filename": "batch.jsonl",
+                    "purpose": "batch",
+                    "status": "processed",
+                }
+            )
+        elif self.path == "/v1/batches":
+            req = json.loads(body)
+            bid = f"batch-{len(self.batches)}"
+            self.batches[bid] = {
+                "id": bid,
+                "object": "batch",
+                "endpoint": req["endpoint"],
+                "input_file_id": req["input_file_id"],
+                "completion_window": req["completion_window"],
+                "created_at": 0,
+                "status": "validating",
+            }
+            self._send(self.batches[bid])
+
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+        if parts[1] == "batches":
+            batch = self.batches[parts[2]]
+            if batch["status"] == "validating":
+                batch["status"] = "in_progress"
+            else:
+                batch["status"] = "completed"
+                batch["output_file_id"] = self._run(batch["input_file_id"])
+            self._send(batch)
+        elif parts[1] == "files" and parts[3] == "content":
+            self._send(self.files[parts[2]], raw=True)
+
+    def _run(self, input_file_id):
+        """Answer the requests of an input file; return the output file."""
+        out = []
+        for line in self.files[input_file_id].splitlines():
+            req = json.loads(line)
+            self.requests.append(req)
+            words = req["body"]["messages"][0]["content"].split()
+            subs = [
+                {
+                    "reference_key": w,
+                    "substance_name": w,
+                    "role_in_reaction": (
+                        "main product" if i == 0 else "reactant"
+                    ),
+                }
+                for i, w in enumerate(words)
+            ]
+            args = json.dumps({"chain_of_thought": "", "substances": subs})
+            if words[0] == "fail":
+                response = {"status_code": 500, "body": {"error": "oops"}}
+            else:
+                message = {
+                    "role": "assistant",
+                    "tool_calls": [{"function": {"arguments": args}}],
+                }
+                response = {
+                    "status_code": 200,
+                    "body": {"choices": [{"message": message}]},
+                }
+            out.append(
+                json.dumps(
+                    {"custom_id": req["custom_id"], "response": response}
+                )
+            )
+        fid = f"file-{len(self.files)}"
+        self.files[fid] = "\n".join(out)
+        return fid
+
+
+@pytest.fixture()
+def client():
+    """OpenAI client talking to a local FakeBatchAPI server."""
+    FakeBatchAPI.files, FakeBatchAPI.batches = {}, {}
+    FakeBatchAPI.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeBatchAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield openai.OpenAI(
+        base_url=f"http://127.0.0.1:{server.server_port}/v1", api_key="test"
+    )
+    server.shutdown()
+
+
+def test_batch_job(client, tmp_path):
+    """Results map back to paragraph ids; cached ones are not resent."""
+    cache = LLMCache(str(tmp_path / "llm.sqlite"))
+    job = BatchJob("gpt-4o", client, cache=cache, poll_interval=0.01)
+    pars = {"a": "2 1", "b": "4 3 2", "c": "fail 5"}
+    prods = job.run(pars)
+
+    assert list(prods) == ["a", "b", "c"]
+    assert prods["b"][0].reference_key == "4"
+    assert [c.reference_key for c in prods["b"][0].children] == ["3", "2"]
+    assert prods["b"][0].text == "4 3 2"
+    assert prods["c"][0].isempty()
+
+    # The request is the forced tool call sent by instructor
+    body = FakeBatchAPI.requests[0]["body"]
+    assert body["tool_choice"]["function"]["name"] == "SubstanceInReactionList"
+
+    again = job.run({"b": "4 3 2", "d": "6 5"})
+    assert [r["custom_id"] for r in FakeBatchAPI.requests] == list("abcd")
+    assert again["b"] == prods["b"]
+
+
+def test_batch_extract_rss(client, monkeypatch):
+    """Paragraphs of several papers go in one batch job."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(clients, "get", lambda *a, **kw: client)
+    trees = [SynthTree.from_dir("tests/examples/") for _ in range(2)]
+    trees[0].rxn_extract = ExtractReaction(llm="gpt-4o")
+
+    prods = asyncio.run(SynthTree.batch_extract_rss(trees, poll_interval=0.01))
+
+    assert len(FakeBatchAPI.batches) == 1
+    assert len(FakeBatchAPI.requests) == 2 * len(trees[0].paragraphs)
+    assert len(prods) == 2 and prods[0] == prods[1]
+    assert trees[1].raw_prods[0].text == trees[1].paragraphs[0].text
+
+
+def test_batch_extract_rss_does_not_block(monkeypatch):
+    """The event loop keeps running while the batch job is polled."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    trees = [SynthTree.from_dir("tests/examples/")]
+    trees[0].rxn_extract = ExtractReaction(llm="gpt-4o")
+    ticks = []
+
+    def batch_extract(self, paragraphs, **kwargs):
+        time.sleep(0.2)
+        return {pid: [] for pid in paragraphs}
+
+    monkeypatch.setattr(ExtractReaction, "batch_extract", batch_extract)
+
+    async def tick():
+        while True:
+            ticks.append(None)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        ticker = asyncio.create_task(tick())
+        await SynthTree.batch_extract_rss(trees)
+        ticker.cancel()
+
+    asyncio.run(main())
+    assert len(ticks) > 5
@@ -0,0 +1,58 @@
+"""Test suite for the shared LLM client registry"""
+
+import asyncio
+
+import instructor
+
+from jasyntho.extract import ClientRegistry, ExtractReaction, clients
+
+
+def test_clients_shared(monkeypatch):
+    """Clients are shared per provider, base URL and key."""
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    registry = ClientRegistry(max_connections=7)
+    a = registry.get("openai")
+    assert registry.get("openai") is a
+    assert registry.get("openai", api_key="other") is not a
+    assert a._client._transport._pool._max_connections == 7
+
+    # Patched clients are distinct, but share the connection pool
+    patched = registry.instructor("openai")
+    assert registry.instructor("openai") is patched
+    mistral = registry.instructor(
+        "openai", "https://x.ai/v1/", "k", mode=instructor.Mode.JSON
+    )
+    assert patched is not mistral
+    assert mistral.client._client is a._client
+
+    session = registry.session("https://api.anthropic.com/v1/messages")
+    assert registry.session("https://api.anthropic.com/v1/messages") is session
+    registry.configure(max_connections=3)
+    assert registry.get("openai") is not a
+
+
+def test_async_clients_per_loop(monkeypatch):
+    """Each event loop gets its own async connection pool."""
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    registry = ClientRegistry()
+    proxy = registry.get("openai", is_async=True)
+
+    async def pool():
+        return proxy._client
+
+    first = asyncio.run(pool())
+    second = asyncio.run(pool())
+    assert first is not second
+    assert len(registry._pools) == 1  # the closed loop's pool is dropped
+
+
+def test_extractors_share_clients(monkeypatch):
+    """Extractors of the same model reuse the registry's clients."""
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-test")
+    one, two = ExtractReaction(llm="gpt-4o"), ExtractReaction(llm="gpt-4")
+    assert one.client is two.client is clients.instructor("openai")
+
+    claude = ExtractReaction(llm="claude-3-haiku-20240307")
+    assert claude.client is clients.instructor("anthropic", api_key="sk-test")
+    assert claude.client is not one.client
@@ -0,0 +1,103 @@
+"""Test suite for the GOSyBench class"""
+
+import networkx as nx
+import pytest
+
+from gosybench.basetypes import STree
+from gosybench.evaluate import GOSyBench, StatsCache, load_tasks
+from gosybench.metrics import GraphEval, TreeMetrics
+
+
+def chain_method(path: str) -> STree:
+    """Picklable test method: a short chain, independent of the task."""
+    g = nx.DiGraph()
+    g.add_edges_from([("1", "2"), ("2", "3")])
+    return STree(graph=g)
+
+
+@pytest.fixture()
+def bench():
+    """Benchmark on the smallest default tasks."""
+    gosybench = GOSyBench(describe=None, metrics=GraphEval())
+    gosybench.tasks = sorted(gosybench.tasks, key=lambda t: t.nnodes)
+    gosybench.tasks = gosybench.tasks[:3]
+    return gosybench
+
+
+def test_parallel_tasks_match_sequential(bench):
+    """Parallel runs return the same results, in task order."""
+    sequential = bench.run_tasks(chain_method)
+
+    bench.workers = 2
+    parallel = bench.run_tasks(chain_method)
+
+    assert [r["name"] for r in parallel] == [t.name for t in bench.tasks]
+    assert parallel == sequential
+
+
+class CountingDescribe:
+    """Versioned descriptor that counts its calls."""
+
+    version = "test"
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, tree):
+        self.calls += 1
+        return {"nnodes": len(tree.graph)}
+
+
+def test_gt_stats_cached(bench, tmp_path):
+    """Ground truths are described once across runs, and persisted."""
+    describe = CountingDescribe()
+    bench.describe = describe
+    bench.gt_cache = StatsCache(str(tmp_path))
+
+    first = bench.run_tasks()
+    second = bench.run_tasks()
+    assert describe.calls == len(bench.tasks)
+    assert first == second
+
+    # A fresh cache on the same directory reads results from disk
+    bench.gt_cache = StatsCache(str(tmp_path))
+    assert bench.run_tasks() == first
+    assert describe.calls == len(bench.tasks)
+
+
+def test_gt_cache_survives_graph_eval(bench, monkeypatch):
+    """GraphEval annotating the ground truth does not change its key."""
+    monkeypatch.setenv("WANDB_MODE", "disabled")
+    describe = CountingDescribe()
+    bench.describe = describe
+
+    bench.evaluate(chain_method)
+    bench.evaluate(chain_method)
+    # Once per ground truth, plus once per extracted tree in each run
+    assert describe.calls == 3 * len(bench.tasks)
+
+
+def test_parallel_outputs_per_task(bench, tmp_path, monkeypatch):
+    """Workers write describe outputs to their own task directories."""
+    monkeypatch.chdir(tmp_path)
+    bench.describe = TreeMetrics()
+    bench.workers = 2
+    bench.out_dir = str(tmp_path / "out")
+
+    bench.run_tasks(chain_method)
+    assert not (tmp_path / "tree.json").exists()
+    for task in bench.tasks:
+        for name in ("gt", "chain_method"):
+            assert (tmp_path / "out" / task.name / name / "tree.json").exists()
+
+
+def test_load_tasks_select():
+    """Tasks are selected by name or glob, and loaded lazily."""
+    tasks = load_tasks(["jacs.7b*", "ja074300t"])
+    names = [t.name for t in tasks]
+    assert "ja074300t" in names
+    assert all(n == "ja074300t" or n.startswith("jacs.7b") for n in names)
+
+    task = tasks[0]
+    assert task._tree is None
+    assert len(task.tree.graph) == task.nnodes
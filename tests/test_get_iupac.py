@@ -0,0 +1,67 @@
+"""Test suite for the concurrent name retrieval"""
+
+import threading
+import time
+
+import pytest
+
+from jasyntho.extract import LLMCache
+from jasyntho.utils import NameRetrieval, get_iupac
+
+
+class Calls(list):
+    """Substances queried; state holds the concurrency counters."""
+
+
+@pytest.fixture()
+def calls(monkeypatch):
+    """Fake RetrieveName calls; records them and the peak concurrency."""
+    calls = Calls()
+    state = {"running": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def retrieve(substance, context):
+        with lock:
+            calls.append(substance)
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        time.sleep(0.02)
+        with lock:
+            state["running"] -= 1
+        if substance == "fail":
+            return None
+        return [f"{substance} in {context}"]
+
+    monkeypatch.setattr(get_iupac, "_retrieve", retrieve)
+    calls.state = state
+    return calls
+
+
+def test_concurrent_and_memoized(calls):
+    """Queries run concurrently, once per (substance, context)."""
+    retrieval = NameRetrieval(max_workers=4)
+    queries = [(str(i), "ctx") for i in range(8)] + [("0", "ctx")]
+    names = retrieval(queries)
+    assert names[0] == names[-1] == ["0 in ctx"]
+    assert len(calls) == 8
+    assert calls.state["peak"] == 4
+
+    assert retrieval([("1", "ctx"), ("1", "other")]) == [
+        ["1 in ctx"],
+        ["1 in other"],
+    ]
+    assert len(calls) == 9
+
+
+def test_persistent_cache(calls, tmp_path):
+    """Results are cached per model; failures are retried."""
+    cache = LLMCache(str(tmp_path / "llm.sqlite"))
+    NameRetrieval(cache=cache)([("a", "ctx"), ("fail", "ctx")])
+    assert NameRetrieval(cache=cache)([("a", "ctx"), ("fail", "ctx")]) == [
+        ["a in ctx"],
+        [],
+    ]
+    assert calls == ["a", "fail", "fail"]
+    assert NameRetrieval.key("a", "ctx", "gpt-4") != NameRetrieval.key(
+        "a", "ctx", "gpt-4o"
+    )
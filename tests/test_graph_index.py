@@ -0,0 +1,47 @@
+"""Test suite for the descendant index of synthesis graphs"""
+
+import networkx as nx
+import pytest
+
+from gosybench.basetypes import STree
+from gosybench.graph_index import DescendantIndex
+
+
+def test_matches_networkx():
+    """Counts and descendants equal nx.descendants, cycles included."""
+    for seed in range(5):
+        G = nx.gnp_random_graph(60, 0.04, seed=seed, directed=True)
+        G.add_edge(3, 3)  # self-loop
+        index = DescendantIndex(G)
+        for n in G:
+            desc = nx.descendants(G, n)
+            assert index.descendants(n) == desc
+            assert index.count(n) == len(desc)
+            assert index.has_descendants(n) == (len(nx.bfs_tree(G, n)) > 1)
+
+
+def test_components():
+    """STree components are the heads with their descendants."""
+    G = nx.DiGraph([("a", "b"), ("b", "c"), ("d", "c"), ("c", "e")])
+    G.add_node("f")
+    components = STree(graph=G).get_components()
+    assert {k: set(g) for k, g in components.items()} == {
+        "a": {"a", "b", "c", "e"},
+        "d": {"d", "c", "e"},
+        "f": {"f"},
+    }
+
+
+def test_component_views():
+    """Components are read-only views sharing the graph's attributes."""
+    G = nx.DiGraph([("a", "b"), ("b", "c"), ("d", "c")])
+    G.nodes["c"]["attr"] = {"smiles": "C"}
+    components = STree(graph=G).get_components()
+
+    view = components["a"]
+    assert view is components["a"]
+    assert view.nodes["c"] is G.nodes["c"]
+    assert set(view.edges) == {("a", "b"), ("b", "c")}
+    assert len(view) == len(components.nodes("a")) == 3
+    with pytest.raises(nx.NetworkXError):
+        view.add_node("e")
@@ -0,0 +1,87 @@
+"""Test suite for the incremental graph construction of SynthTree"""
+
+import random
+from types import SimpleNamespace
+
+from jasyntho import SynthTree
+from jasyntho.extract import Product
+from jasyntho.extract.substances import SubstanceInReaction
+
+
+def random_products(n, nkeys, seed):
+    """Products with random (repeated) keys and children."""
+    rng = random.Random(seed)
+    roles = ["reactant", "reagent", "solvent"]
+    return [
+        Product(
+            reference_key=str(rng.randrange(nkeys)),
+            substance_name="p",
+            children=[
+                SubstanceInReaction(
+                    reference_key=str(rng.randrange(nkeys)),
+                    substance_name="c",
+                    role_in_reaction=rng.choice(roles),
+                )
+                for _ in range(rng.randrange(3))
+            ],
+            chain_of_thought="",
+        )
+        for _ in range(n)
+    ]
+
+
+def assert_same(tree, G, subgraphs):
+    """tree's graph and reachable subgraphs equal the ones built anew."""
+    expected = SynthTree.get_reach_subgraphs(G)
+    assert set(tree.full_g.nodes) == set(G.nodes)
+    assert set(tree.full_g.edges) == set(G.edges)
+    for n, d in G.nodes(data=True):
+        assert tree.full_g.nodes[n] == d
+    assert subgraphs.keys() == expected.keys()
+    for h, g in expected.items():
+        assert set(subgraphs[h].nodes) == set(g.nodes)
+        assert set(subgraphs[h].edges) == set(g.edges)
+
+
+def test_add_products_incremental():
+    """Adding products in chunks gives the graph built at once."""
+    tree = SynthTree.from_dir("tests/examples/")
+    for seed in range(5):
+        prods = random_products(80, 60, seed)
+        tree.full_g = tree.get_full_graph([])
+        for i in range(0, len(prods), 7):
+            tree.add_products(prods[i : i + 7])
+            subgraphs = tree.update_reach_subgraphs()
+
+        G = tree.get_full_graph(tree.unique_keys(prods))
+        assert_same(tree, G, subgraphs)
+
+
+def test_add_connections():
+    """Connections rewire the graph without a rebuild."""
+    tree = SynthTree.from_dir("tests/examples/")
+    tree.products = random_products(60, 50, 0)
+    tree.partition()
+
+    rng = random.Random(1)
+    nodes = list(tree.full_g.nodes)
+    new_connects = {
+        k: {
+            "step 2": SimpleNamespace(product=SimpleNamespace(reference_key=p))
+        }
+        for k, p in zip(rng.sample(nodes, 10), rng.sample(nodes, 10))
+    }
+    new_connects["none"] = None
+    tree.add_connections(new_connects)
+    subgraphs = tree.update_reach_subgraphs()
+
+    G = tree.get_full_graph(tree.unique_keys(tree.products))
+    for k, res in new_connects.items():
+        if res is not None:
+            prod = res["step 2"].product.reference_key
+            if prod in G.nodes and k != prod:
+                G.add_edge(prod, k)
+    assert_same(tree, G, subgraphs)
+
+    # partition builds the same graph from scratch
+    assert_same(tree, G, tree.partition(new_connects))
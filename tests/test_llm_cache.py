@@ -0,0 +1,98 @@
+"""Test suite for the persistent LLM response cache"""
+
+import asyncio
+
+import pytest
+
+from jasyntho.extract import LLMCache, Product
+from jasyntho.extract.substances.substance import SubstanceInReactionList
+
+
+class FakeClient:
+    """Stand-in for an instructor-patched client. Counts requests."""
+
+    def __init__(self):
+        self.calls = 0
+        self.chat = self
+        self.completions = self
+
+    def response(self, **kwargs):
+        self.calls += 1
+        return SubstanceInReactionList(
+            chain_of_thought="",
+            substances=[
+                {
+                    "reference_key": "2",
+                    "substance_name": "b",
+                    "role_in_reaction": "main product",
+                },
+                {
+                    "reference_key": "1",
+                    "substance_name": "a",
+                    "role_in_reaction": "reactant",
+                },
+            ],
+        )
+
+    def create(self, **kwargs):
+        return self.response(**kwargs)
+
+
+class FakeAsyncClient(FakeClient):
+    """Async version of FakeClient."""
+
+    async def create(self, **kwargs):
+        return self.response(**kwargs)
+
+
+@pytest.fixture()
+def cache(tmp_path):
+    """Empty cache in a temporary directory."""
+    return LLMCache(str(tmp_path / "llm.sqlite"))
+
+
+def test_cache_hit(cache):
+    """A repeated paragraph is served from the cache."""
+    client = FakeClient()
+    first = Product.from_paragraph("text", client, "gpt-4", cache)
+    second = Product.from_paragraph("text", client, "gpt-4", cache)
+    assert client.calls == 1
+    assert first == second
+
+    # Other model, other key
+    Product.from_paragraph("text", client, "gpt-4o", cache)
+    assert client.calls == 2
+
+
+def test_async_cache_hit(cache):
+    """The async path shares entries with the sync path."""
+    Product.from_paragraph("text", FakeClient(), "gpt-4", cache)
+
+    aclient = FakeAsyncClient()
+    prods = asyncio.run(
+        Product.async_from_paragraph("text", aclient, "gpt-4", cache)
+    )
+    assert aclient.calls == 0
+    assert prods[0].reference_key == "2"
+
+
+def test_bypass(cache):
+    """bypass_cache skips lookups but refreshes the entry."""
+    client = FakeClient()
+    Product.from_paragraph("text", client, "gpt-4", cache)
+    Product.from_paragraph("text", client, "gpt-4", cache, bypass_cache=True)
+    assert client.calls == 2
+    assert len(cache) == 1
+
+
+def test_eviction(tmp_path):
+    """Least recently used entries are evicted beyond max size."""
+    cache = LLMCache(str(tmp_path / "llm.sqlite"), max_size_mb=1e-3)
+    client = FakeClient()
+    for i in range(10):
+        Product.from_paragraph(f"text {i}", client, "gpt-4", cache)
+    assert 0 < len(cache) < 10
+
+    # The most recent entry survives
+    Product.from_paragraph("text 9", client, "gpt-4", cache)
+    assert client.calls == 10
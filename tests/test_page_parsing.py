@@ -0,0 +1,119 @@
+"""Test suite for page-level parsing of SI documents"""
+
+import json
+import os
+import shutil
+
+import fitz
+import pytest
+
+from jasyntho import SynthTree
+from jasyntho.document import pages
+from jasyntho.document.pages import DocPages
+
+
+def test_parallel_pages_match_sequential():
+    """Parsing pages in a process pool gives the same paragraphs."""
+    tree = SynthTree.from_dir("tests/examples/")
+    doc = fitz.open("tests/examples/synth_SI_sub2.pdf")
+
+    sequential = tree._get_pars_per_page(doc, 0, doc.page_count, workers=1)
+    parallel = tree._get_pars_per_page(doc, 0, doc.page_count, workers=3)
+    assert len(sequential) > 0
+    assert parallel == sequential
+
+
+def test_doc_pages():
+    """Text and blocks are read once each, and match direct extraction."""
+    doc = fitz.open("tests/examples/synth_SI_sub2.pdf")
+    pages = DocPages(doc)
+
+    assert pages.text() == "".join(p.get_text() for p in doc)
+    assert pages.retained() == 0
+    assert pages.blocks(3) is pages.blocks(3)
+    blocks = doc[3].get_text("dict")["blocks"]
+    assert [b.get("lines") for b in pages.blocks(3)] == [
+        b.get("lines") for b in blocks
+    ]
+
+    parallel = DocPages(fitz.open(doc.name))
+    parallel.extract_all(workers=2)
+    assert parallel._blocks == [pages.blocks(i) for i in range(len(pages))]
+
+
+def test_extract_all_merged():
+    """Pages of merged files are extracted in workers from their files."""
+    paths = [
+        "tests/examples/synth_SI_sub2.pdf",
+        "tests/examples/synth_SI_sub3.pdf",
+    ]
+    merged = DocPages.open(paths)
+    assert merged.path is None
+    merged.extract_all(workers=2)
+
+    sequential = DocPages.open(paths)
+    assert merged._blocks == [
+        sequential.blocks(i) for i in range(len(sequential))
+    ]
+
+
+def test_si_pages_shared(tmp_path):
+    """Paragraph parsing of an SI file reuses the SI page cache."""
+    for f in ("paper.pdf", "si_0.pdf"):
+        shutil.copy(os.path.join("tests/examples", f), tmp_path)
+    shutil.copy("tests/examples/synth_SI_sub2.pdf", tmp_path / "si_1.pdf")
+    tree = SynthTree.from_dir(str(tmp_path))
+
+    # Only plain text is read when loading
+    assert tree.paper_pages.retained() == 0
+    assert tree.si_pages.retained() == 0
+
+    si_0 = str(tmp_path / "si_0.pdf")
+    start, end = next(
+        (s, s + n) for p, s, n in tree.si_pages.files if p == si_0
+    )
+    relev = tree._si_range(si_select=False)
+    assert relev.pages is tree.si_pages
+    assert (relev.start, relev.end) == (start, end)
+    assert relev.text() == "".join(p.get_text() for p in fitz.open(si_0))
+
+
+def test_parse_cache(tmp_path, monkeypatch):
+    """Parsed pages and paragraphs are reloaded from the cache file."""
+    for f in ("paper.pdf", "si_0.pdf"):
+        shutil.copy(os.path.join("tests/examples", f), tmp_path)
+    tree = SynthTree.from_dir(str(tmp_path), parse_cache=True)
+    si_0 = str(tmp_path / "si_0.pdf")
+    pars = tree._clean_up_pars(tree._get_pars_per_page(tree.si_pages, 0, 2))
+    blocks = tree.si_pages.blocks(0)
+    tree.si_pages.persist()
+    assert os.path.exists(DocPages.cache_path(si_0))
+
+    calls = []
+
+    def spy(extract):
+        def wrapped(page):
+            calls.append(page.number)
+            return extract(page)
+
+        return wrapped
+
+    monkeypatch.setattr(pages, "_extract_text", spy(pages._extract_text))
+    monkeypatch.setattr(pages, "_extract_blocks", spy(pages._extract_blocks))
+
+    # Nothing is extracted from the pdfs on a second run
+    cached = SynthTree.from_dir(str(tmp_path), parse_cache=True)
+    assert cached.si == tree.si and cached.paper == tree.paper
+    cached_pars = cached._clean_up_pars(
+        cached._get_pars_per_page(cached.si_pages, 0, 2)
+    )
+    assert [p.text for p in cached_pars] == [p.text for p in pars]
+    assert cached.si_pages._pars[:2] == tree.si_pages._pars[:2]
+    assert cached.si_pages.blocks(0) == json.loads(json.dumps(blocks))
+    assert calls == []
+
+    # Another parser version ignores the cache
+    monkeypatch.setattr(pages, "PARSER_VERSION", "test")
+    fresh = SynthTree.from_dir(str(tmp_path), parse_cache=True)
+    assert fresh.si == tree.si
+    assert len(calls) == len(fresh.paper_pages) + len(fresh.si_pages)
@@ -0,0 +1,81 @@
+"""Test suite for the paragraph extraction scheduler"""
+
+import asyncio
+
+from jasyntho.document.synthpar import SynthParagraph
+from jasyntho.extract import ExtractionScheduler, Product
+
+
+class RateLimitError(Exception):
+    """Mimics the 429 errors raised by LLM clients."""
+
+    status_code = 429
+
+
+class FakeExtractor:
+    """Records concurrency and fails the first calls with a 429."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+
+    async def async_call(self, text):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01 * (int(text) % 3))
+            if self.failures > 0:
+                self.failures -= 1
+                raise RateLimitError()
+            prd = Product.empty(note=text)
+            prd.reference_key = text
+            return [prd]
+        finally:
+            self.in_flight -= 1
+
+
+def paragraphs(n):
+    return [SynthParagraph(str(i)) for i in range(n)]
+
+
+def test_bounded_and_ordered():
+    """No more than max_in_flight requests; run keeps paragraph order."""
+    extractor = FakeExtractor()
+    scheduler = ExtractionScheduler(max_in_flight=3)
+    results = asyncio.run(scheduler.run(paragraphs(20), extractor))
+
+    assert extractor.max_in_flight == 3
+    assert [r[0].reference_key for r in results] == [str(i) for i in range(20)]
+
+
+def test_stream_yields_all():
+    """stream yields every paragraph once, as extractions complete."""
+
+    async def collect():
+        scheduler = ExtractionScheduler(max_in_flight=5)
+        return [
+            i
+            async for i, _ in scheduler.stream(paragraphs(9), FakeExtractor())
+        ]
+
+    order = asyncio.run(collect())
+    assert sorted(order) == list(range(9))
+    assert order != list(range(9))
+
+
+def test_rate_limit_backoff():
+    """429s are retried; exhausted retries become empty products."""
+    extractor = FakeExtractor(failures=2)
+    scheduler = ExtractionScheduler(max_in_flight=1, base_delay=0.01)
+    results = asyncio.run(scheduler.run(paragraphs(3), extractor))
+    assert extractor.calls == 5
+    assert all(not r[0].isempty() for r in results)
+
+    extractor = FakeExtractor(failures=10)
+    scheduler = ExtractionScheduler(max_retries=1, base_delay=0.01)
+    results = asyncio.run(scheduler.run(paragraphs(1), extractor))
+    assert results[0][0].isempty()
+    assert results[0][0].text == "0"
@@ -0,0 +1,122 @@
+"""Test suite for the compact graph format"""
+
+import os
+import pickle
+
+import networkx as nx
+import pytest
+
+from gosybench.basetypes import Product, STree
+from gosybench.serialize import convert_pickle, load_graph, save_graph
+
+GT_PICKLE = "src/gosybench/data/papers/jacs.0c00308/gt_graph.pickle"
+
+
+@pytest.fixture()
+def graph():
+    """Small graph with nested, missing and non-string attributes."""
+    g = nx.DiGraph(name="test")
+    g.add_node("S1", attr={"smiles": "CCO", "children": [{"k": 1}]})
+    g.add_node(2, attr={"substance_name": "ethanol • HCl", "note": None})
+    g.add_node(("a", 1), is_head=True)
+    g.add_node("isolated")
+    g.add_edge("S1", 2, attr={"type": "lab reaction"})
+    g.add_edge(2, ("a", 1))
+    return g
+
+
+def test_roundtrip(graph, tmp_path):
+    """Nodes, edges and attributes survive a save/load roundtrip."""
+    path = str(tmp_path / "g.gosyg")
+    save_graph(graph, path)
+
+    for mmap in (True, False):
+        loaded, products = load_graph(path, mmap=mmap)
+        assert products is None
+        assert loaded.graph == graph.graph
+        assert list(loaded.nodes(data=True)) == list(graph.nodes(data=True))
+        assert list(loaded.edges(data=True)) == list(graph.edges(data=True))
+
+
+def test_roundtrip_types(tmp_path):
+    """Tuples and non-string dict keys load back as they were saved."""
+    g = nx.DiGraph(bounds=(0, 1))
+    g.add_node(
+        (("a", 1), 2),
+        attr={"span": (3, 4), "by_page": {1: "x", (2, 3): ["y", (5,)]}},
+        __tuple__="tag-like key",
+    )
+    g.add_node(1, attr={"__items__": [1, 2]})
+    g.add_edge((("a", 1), 2), 1, attr={7: None})
+    path = str(tmp_path / "g.gosyg")
+    save_graph(g, path)
+
+    loaded, _ = load_graph(path)
+    assert loaded.graph == g.graph
+    assert list(loaded.nodes(data=True)) == list(g.nodes(data=True))
+    assert list(loaded.edges(data=True)) == list(g.edges(data=True))
+    assert isinstance(loaded.nodes[1]["attr"]["__items__"], list)
+
+
+def test_unsupported_type(tmp_path):
+    """Values that would not round-trip are rejected."""
+    g = nx.DiGraph()
+    g.add_node("S1", attr={"tags": {"a", "b"}})
+    with pytest.raises(TypeError):
+        save_graph(g, str(tmp_path / "g.gosyg"))
+
+
+def test_rows_do_not_share_values(tmp_path):
+    """Equal list values are decoded separately for each node."""
+    g = nx.DiGraph()
+    g.add_node("a", refs=["x"])
+    g.add_node("b", refs=["x"])
+    path = str(tmp_path / "g.gosyg")
+    save_graph(g, path)
+
+    loaded, _ = load_graph(path)
+    loaded.nodes["a"]["refs"].append("y")
+    assert loaded.nodes["b"]["refs"] == ["x"]
+
+
+def test_structure_only(graph, tmp_path):
+    """attrs=False decodes only node keys and edges."""
+    path = str(tmp_path / "g.gosyg")
+    save_graph(graph, path)
+
+    loaded, _ = load_graph(path, attrs=False)
+    assert list(loaded.nodes) == list(graph.nodes)
+    assert list(loaded.edges) == list(graph.edges)
+    assert loaded.nodes["S1"] == {}
+
+
+def test_stree_products(tmp_path):
+    """STree.save stores the products along with the graph."""
+    g = nx.DiGraph([("1", "2")])
+    products = [
+        Product(
+            reference_key="1",
+            substance_name="a",
+            children=[Product(reference_key="2", substance_name="b")],
+        )
+    ]
+    path = str(tmp_path / "t.gosyg")
+    STree(products=products, graph=g).save(path)
+
+    tree = STree.load(path)
+    assert tree.products[0].reference_key == "1"
+    assert tree.products[0].children[0].reference_key == "2"
+
+
+def test_convert_pickle(tmp_path):
+    """Converted ground truths load as the pickled ones do."""
+    dst = convert_pickle(GT_PICKLE, str(tmp_path / "gt_graph.gosyg"))
+    assert os.path.exists(dst)
+
+    ref = STree.from_pickle(GT_PICKLE)
+    tree = STree.load(dst)
+    with open(GT_PICKLE, "rb") as f:
+        g = pickle.load(f)
+    assert list(tree.graph.nodes(data=True)) == list(g.nodes(data=True))
+    assert list(tree.graph.edges(data=True)) == list(g.edges(data=True))
+    assert tree.products == ref.products
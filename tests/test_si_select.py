@@ -0,0 +1,67 @@
+"""Test suite for the SISplitter class"""
+
+import os
+import random
+import shutil
+
+import numpy as np
+
+from jasyntho import SynthTree
+from jasyntho.document.pages import PageRange
+from jasyntho.document.si_select import SISplitter
+
+
+def longest_true_loop(bools):
+    """Reference implementation of SISplitter.find_longest_true."""
+    max_len = max_start = max_end = start = 0
+    for i, b in enumerate(bools):
+        if b:
+            if start == 0:
+                start = i
+        elif start != 0:
+            if i - start > max_len:
+                max_len, max_start, max_end = i - start, start, i
+            start = 0
+    return max_start, max_end
+
+
+def test_ratios_match_regex():
+    """Vectorized character counts match the per-sentence regexes."""
+    random.seed(0)
+    chars = "aAbZz09 .,;[]{}\\-_é€µ\t!@#$%^&*()<>?/|~`'\"+=Ω"
+    splitter = SISplitter()
+    for _ in range(50):
+        sents = [
+            "".join(random.choices(chars, k=random.randint(0, 40)))
+            for _ in range(random.randint(0, 30))
+        ]
+        expected = [splitter._ratio_si(s) for s in sents]
+        assert splitter._ratios(sents).tolist() == expected
+
+
+def test_find_longest_true():
+    """Runs are found as by the original loop."""
+    random.seed(0)
+    splitter = SISplitter()
+    for _ in range(200):
+        bools = [random.random() < 0.6 for _ in range(random.randint(0, 40))]
+        assert splitter.find_longest_true(
+            np.array(bools)
+        ) == longest_true_loop(bools)
+
+
+def test_select_relevant_is_a_view(tmp_path):
+    """Selecting the SI neither modifies it nor writes a new pdf."""
+    for f in ("paper.pdf", "ja2c04487_si_001.pdf"):
+        shutil.copy(os.path.join("tests/examples", f), tmp_path)
+    os.rename(tmp_path / "ja2c04487_si_001.pdf", tmp_path / "si_0.pdf")
+    doc = SynthTree.from_dir(str(tmp_path))
+    npages = doc.fitz_si.page_count
+
+    splitter = SISplitter(window_size=150, signal_threshold=0.35)
+    selected = splitter.select_relevant(doc)
+    assert isinstance(selected, PageRange)
+    assert selected.pages is doc.si_pages
+    assert (selected.start, selected.end - 1) == splitter.pages
+    assert doc.fitz_si.page_count == npages
+    assert sorted(os.listdir(tmp_path)) == ["paper.pdf", "si_0.pdf"]
@@ -0,0 +1,146 @@
+"""Test suite for the streaming paragraph-to-graph pipeline"""
+
+import asyncio
+import zlib
+
+import networkx as nx
+
+from jasyntho import SynthTree
+from jasyntho.document.pages import PageRange
+from jasyntho.extract import ExtractionScheduler, Product
+from jasyntho.extract.substances import SubstanceInReaction
+
+
+class FakeExtractor:
+    """Deterministic products from paragraph text, returned out of order."""
+
+    async def async_call(self, text):
+        h = zlib.crc32(text.encode())
+        await asyncio.sleep(0.001 * (h % 7))
+        children = [
+            SubstanceInReaction(
+                reference_key=str((h >> s) % 12),
+                substance_name="x",
+                role_in_reaction="reactant",
+            )
+            for s in (3, 7)
+        ]
+        prd = Product(
+            reference_key=str(h % 12),  # duplicated keys across paragraphs
+            substance_name=text[:10],
+            children=children,
+            chain_of_thought="",
+        )
+        prd.text = text
+        return [prd]
+
+
+def test_stream_graph_matches_batch():
+    """The incremental graph equals the one built after extraction."""
+    tree = SynthTree.from_dir("tests/examples/")
+    tree.rxn_extract = FakeExtractor()
+    tree.scheduler = ExtractionScheduler(max_in_flight=4)
+
+    async def consume():
+        return [prods async for prods in tree.stream_graph()]
+
+    streamed = asyncio.run(consume())
+    assert len(streamed) == len(tree.paragraphs) > 1
+
+    batch = tree.get_full_graph(tree.unique_keys(tree.raw_prods))
+    assert set(tree.full_g.nodes) == set(batch.nodes)
+    assert set(tree.full_g.edges) == set(batch.edges)
+    for n, d in batch.nodes(data=True):
+        streamed = dict(tree.full_g.nodes[n])
+        assert isinstance(streamed.pop("is_head"), bool)
+        assert streamed == d
+
+    # Paragraphs are split as in the non-streaming parser
+    doc = tree.load("tests/examples/si_0.pdf")[0]
+    pars = tree._clean_up_pars(tree._get_pars_per_page(doc, 0, len(doc)))
+    assert [p.text for p in pars] == [p.text for p in tree.paragraphs]
+
+
+def test_merge_product_order():
+    """Earlier products win over later ones with the same key."""
+
+    def product(key, children):
+        return Product(
+            reference_key=key,
+            substance_name=key,
+            children=[
+                SubstanceInReaction(
+                    reference_key=c,
+                    substance_name=c,
+                    role_in_reaction="reactant",
+                )
+                for c in children
+            ],
+            chain_of_thought="",
+        )
+
+    prods = [product("1", ["2", "3"]), product("1", ["4"]), product("4", [])]
+    tree = SynthTree.from_dir("tests/examples/")
+    batch = tree.get_full_graph(tree.unique_keys(prods))
+
+    for order in ([1, 2, 0], [2, 1, 0], [0, 1, 2]):
+        G, owners = nx.DiGraph(), {}
+        for i in order:
+            tree._merge_product(G, prods[i], (i, 0), owners)
+        assert set(G.edges) == set(batch.edges)
+        assert set(G.nodes) == set(batch.nodes)
+
+
+def test_stream_graph_memory_flat():
+    """Streaming holds the layout blocks of at most one page at a time."""
+    tree = SynthTree.from_dir("tests/examples/")
+    pages = tree.si_pages
+    segment = pages.paragraphs
+    retained = []
+
+    def paragraphs(i, split):
+        retained.append(pages.retained())
+        return segment(i, split)
+
+    pages.paragraphs = paragraphs
+
+    async def consume():
+        async for _ in tree._stream_paragraphs(PageRange(pages)):
+            retained.append(pages.retained())
+
+    asyncio.run(consume())
+    assert len(tree.paragraphs) > 10
+    assert len(retained) == len(pages) + len(tree.paragraphs)
+    assert max(retained) <= 1
+    assert pages.retained() == 0
+
+
+class KeylessExtractor(FakeExtractor):
+    """FakeExtractor that also finds a product without a key."""
+
+    async def async_call(self, text):
+        prods = await super().async_call(text)
+        keyless = prods[0].model_copy(update={"reference_key": None})
+        return [keyless] + prods
+
+
+def test_stream_graph_matches_partition():
+    """Keyless products are skipped; heads are set as partition does."""
+    tree = SynthTree.from_dir("tests/examples/")
+    tree.rxn_extract = KeylessExtractor()
+    tree.scheduler = ExtractionScheduler(max_in_flight=4)
+
+    async def consume():
+        return [prods async for prods in tree.stream_graph()]
+
+    asyncio.run(consume())
+    assert None not in tree.full_g
+    streamed = tree.full_g
+    reach = {h: set(g) for h, g in tree.reach_subgraphs.items()}
+
+    tree.reach_subgraphs = tree.partition()
+    assert set(streamed.edges) == set(tree.full_g.edges)
+    assert dict(streamed.nodes(data=True)) == dict(
+        tree.full_g.nodes(data=True)
+    )
+    assert reach == {h: set(g) for h, g in tree.reach_subgraphs.items()}
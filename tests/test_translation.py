@@ -0,0 +1,107 @@
+"""Test suite for name to SMILES resolution"""
+
+import networkx as nx
+import pytest
+
+from jasyntho import SynthTree
+from jasyntho.utils import SmilesResolver, translation
+
+KNOWN = {"ethanol": "CCO", "benzene": "c1ccccc1", "acetone": "CC(=O)C"}
+
+
+@pytest.fixture()
+def calls(monkeypatch):
+    """Fake OPSIN; records the names of each call."""
+    calls = []
+
+    def py2opsin(names, tmp_fpath):
+        calls.append(list(names))
+        return [KNOWN.get(n, "") for n in names]
+
+    monkeypatch.setattr(translation, "py2opsin", py2opsin)
+    monkeypatch.setattr(translation, "_resolver", SmilesResolver())
+    return calls
+
+
+def test_resolve_batched(calls):
+    """Names are resolved in chunks, each in a single OPSIN call."""
+    resolver = SmilesResolver(chunk_size=2, workers=2)
+    names = ["ethanol", "benzene", "foo", "acetone", "ethanol"]
+    smiles = resolver.resolve(names)
+    assert smiles == {
+        "ethanol": "CCO",
+        "benzene": "c1ccccc1",
+        "foo": None,
+        "acetone": "CC(=O)C",
+    }
+    assert sorted(map(len, calls)) == [2, 2]
+
+    # Memoized, failures included
+    resolver.resolve(["foo", "benzene"])
+    assert len(calls) == 2
+
+
+def test_labels_stripped(calls):
+    """Failed names are retried without their label, in one more call."""
+    resolver = SmilesResolver()
+    pairs = [("ethanol (3a)", "3a"), ("benzene", "4"), ("bar 5", "5")]
+    assert resolver.resolve_labeled(pairs) == ["CCO", "c1ccccc1", None]
+    assert len(calls) == 2
+    assert resolver("acetone 7", "7") == "CC(=O)C"
+
+
+def test_persistent_memo(calls, tmp_path):
+    """The memo file is shared between resolvers."""
+    path = str(tmp_path / "smiles.sqlite")
+    SmilesResolver(path).resolve(["ethanol", "foo"])
+    assert SmilesResolver(path).resolve(["foo", "ethanol"]) == {
+        "foo": None,
+        "ethanol": "CCO",
+    }
+    assert len(calls) == 1
+
+
+def test_failed_call_not_memoized(monkeypatch):
+    """Names of a failed OPSIN call are not stored as unparseable."""
+    monkeypatch.setattr(translation, "py2opsin", lambda names, **kw: False)
+    resolver = SmilesResolver()
+    assert resolver.resolve(["ethanol"]) == {"ethanol": None}
+    assert resolver._memo == {}
+
+
+def test_gather_smiles(calls):
+    """Nodes with children are resolved in a few batched OPSIN calls."""
+    tree = SynthTree.from_dir("tests/examples/")
+    G = nx.DiGraph()
+    nodes = [("0", "y"), ("1", "ethanol"), ("2", "benzene 2"), ("3", "x")]
+    for key, name in nodes:
+        G.add_node(
+            key,
+            attr={"substance_name": name, "reference_key": key, "text": ""},
+        )
+    G.add_edges_from([("0", "1"), ("1", "2"), ("2", "3")])
+    tree.full_g = G
+    queries = []
+    tree.name_retrieval = lambda q: queries.append(q) or [["z", "acetone"]]
+    tree.gather_smiles()
+
+    assert G.nodes["1"]["attr"]["smiles"] == "CCO"
+    assert G.nodes["2"]["attr"]["smiles"] == "c1ccccc1"
+    assert "smiles" not in G.nodes["3"]["attr"]  # leaf, not resolved
+
+    # Unresolved names are retrieved in one batch
+    assert queries == [[("0", "")]]
+    assert G.nodes["0"]["attr"]["iupac"] == "acetone"
+    assert G.nodes["0"]["attr"]["smiles"] == "CC(=O)C"
+    assert len(calls) == 3
+
+
+def test_resolver_shared_across_trees(calls):
+    """Trees share one memo by default, also with name_to_smiles."""
+    trees = [SynthTree.from_dir("tests/examples/") for _ in range(2)]
+    assert trees[0].smiles_resolver is trees[1].smiles_resolver
+
+    trees[0].smiles_resolver.resolve(["benzene"])
+    assert translation.name_to_smiles("benzene", "") == "c1ccccc1"
+    trees[1].smiles_resolver.resolve(["benzene"])
+    assert calls == [["benzene"]]
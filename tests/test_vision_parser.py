@@ -0,0 +1,141 @@
+"""Test suite for the VisionParser class"""
+
+import asyncio
+import os
+from types import SimpleNamespace
+
+import fitz
+
+from jasyntho.document import parsing
+from jasyntho.document.cache import RenderCache
+from jasyntho.document.pages import DocPages, PageRange
+from jasyntho.document.parsing import VisionParser, dedup_paragraphs
+
+SI = os.path.abspath("tests/examples/synth_SI_sub2.pdf")
+
+
+class FakeClient:
+    """Fake chat client; answers with the batch and number of images."""
+
+    def __init__(self):
+        self.batches = []
+        self.chat = SimpleNamespace(completions=self)
+
+    async def create(self, model, messages, max_tokens):
+        images = [c for c in messages[1]["content"] if c["type"] != "text"]
+        self.batches.append(len(images))
+        return SimpleNamespace(
+            choices=[
+                SimpleNamespace(
+                    message=SimpleNamespace(
+                        content=f"batch {len(self.batches)}: "
+                        f"{len(images)} pages"
+                    )
+                )
+            ],
+            usage=SimpleNamespace(prompt_tokens=0, completion_tokens=0),
+        )
+
+
+def parser(**kwargs):
+    """VisionParser that does not need an API key."""
+    return VisionParser(ptype="text", api_key=None, **kwargs)
+
+
+def test_render_file_in_memory(tmp_path, monkeypatch):
+    """Pages are rendered to JPEG at the requested resolution."""
+    monkeypatch.chdir(tmp_path)
+    low = parsing._render_file(SI, 0, 50)
+    high = parsing._render_file(SI, 0, 100)
+
+    assert low[:2] == b"\xff\xd8"  # JPEG magic
+    assert 2 * fitz.Pixmap(low).width == fitz.Pixmap(high).width
+    assert low == parsing._render(fitz.open(SI), 0, 50)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_vision_parse_page_range(monkeypatch):
+    """Only the pages of the range are rendered, batch by batch."""
+    client = FakeClient()
+    monkeypatch.setattr(parsing.clients, "get", lambda *a, **kw: client)
+    rendered = []
+    render = parsing._render
+    monkeypatch.setattr(
+        parsing,
+        "_render",
+        lambda doc, i, dpi: rendered.append(i) or render(doc, i, dpi),
+    )
+
+    pages = PageRange(DocPages(fitz.open(SI)), 2, 9)
+    pars = asyncio.run(
+        parser(dpi=20, max_batches=2).vision_parse(pages, batch_size=3)
+    )
+
+    # 7 pages in batches of 3 with one page of overlap
+    assert client.batches == [3, 3, 3]
+    assert sorted(set(rendered)) == list(range(2, 9))
+    assert sorted(p.text for p in pars) == [
+        f"batch {i}: 3 pages" for i in (1, 2, 3)
+    ]
+
+
+def test_render_cache(tmp_path, monkeypatch):
+    """Rendered pages are cached by content; reruns render nothing."""
+    client = FakeClient()
+    monkeypatch.setattr(parsing.clients, "get", lambda *a, **kw: client)
+    cache = RenderCache(str(tmp_path / "renders"))
+    pages = PageRange(DocPages.open([SI]), 0, 4)
+    asyncio.run(
+        parser(dpi=20, workers=2, render_cache=cache).vision_parse(pages)
+    )
+    assert len(cache) == 4
+
+    # Same content under another path: served from the cache
+    copy = tmp_path / "copy.pdf"
+    copy.write_bytes(open(SI, "rb").read())
+    monkeypatch.setattr(parsing, "_render", None)
+    monkeypatch.setattr(parsing, "_render_file", None)
+    pages = PageRange(DocPages.open([str(copy)]), 0, 4)
+    asyncio.run(parser(dpi=20, render_cache=cache).vision_parse(pages))
+    assert client.batches == [4, 4]
+
+    # Other resolution, other key
+    key = cache.key(pages.pages.file_hash(str(copy)), 0, 20)
+    assert cache.get(key) is not None
+    assert cache.get(cache.key(pages.pages.file_hash(SI), 0, 30)) is None
+
+
+def test_token_budget_batches():
+    """Batches are packed up to the image and token limits."""
+    pages = PageRange(DocPages(fitz.open(SI)))
+    vp = parser(dpi=200)
+    cost = vp.page_tokens(pages.pages.doc, 0)
+    assert cost == 765  # 2x2 tiles for a letter page
+
+    assert vp.create_batches(pages, 4, "##")[:2] == [(0, 4), (3, 7)]
+    vp = parser(dpi=200, max_input_tokens=2 * cost + 1000)
+    batches = vp.create_batches(pages, 10, "##")
+    assert batches[:2] == [(0, 2), (1, 3)]
+    assert batches[-1][1] == len(pages)
+
+    # A page over budget still gets its own batch
+    vp = parser(dpi=200, max_input_tokens=10)
+    assert vp.create_batches(PageRange(pages.pages, 0, 3), 10, "##") == [
+        (0, 1),
+        (1, 2),
+        (2, 3),
+    ]
+
+
+def test_dedup_overlap_paragraphs():
+    """Reactions of overlap pages are kept once, in the longer version."""
+    a = "Compound 3 was made from 1 and 2 in THF"
+    b = "Compound 5 was made from 3 and 4 in DCM"
+    c = "Compound 7 was made from 5 and 6 in MeOH"
+    batches = [
+        [a, " ", b],
+        [" " + b.lower() + " at rt", c],
+        [c],
+        [a],
+    ]
+    assert dedup_paragraphs(batches) == [a, " " + b.lower() + " at rt", c, a]